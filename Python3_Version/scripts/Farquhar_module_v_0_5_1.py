@@ -39,7 +39,7 @@ def An_k_calc(Av_k, Aj_k, Rd):
 
 def quad_Av_calc(gc0, Ca, Vcmax, Rd, Kc, Ko, O2, gammaStar):
     aa = -1.0/gc0
-    bb = Ca + (Vcmax - Rd)/g + Kc*(1.0 + O2/Ko)
+    bb = Ca + (Vcmax - Rd)/gc0 + Kc*(1.0 + O2/Ko)
     cc = Vcmax*(gammaStar - Ca) + Rd*(Ca + Kc*(1.0 + O2/Ko))
     det = bb**2 - 4.0*aa*cc
 
@@ -185,8 +185,8 @@ def Jmax_calc(Jmax25, t, R):
 #          of the photosynthetic response to light
 
 def J_calc(Ir, Jmax, phi_J, theta_J):
-    Ji = Ir * phiJ
-    aa = thetaJ
+    Ji = Ir * phi_J
+    aa = theta_J
     bb = -Ji -Jmax
     cc = Ji*Jmax
     J = (-bb - sqrt(bb*bb - 4.0*aa*cc))/(2.0*aa)
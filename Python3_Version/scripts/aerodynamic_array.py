@@ -0,0 +1,141 @@
+"""
+Created October 18, 2026
+
+Array version of aerodynamic_conductance_module_v_1.calc_Gva.
+
+calc_Gva takes whole u_ref, t_ref and p_atm columns from the forcing file
+and assumes neutral stability (psi_m = psi_h = 0) like the scalar function.
+calc_Gva_stability adds Monin-Obukhov stability corrections (Campbell and
+Norman 1998, Ch. 7).  The sensible heat flux needed for the Obukhov length
+comes from the surface-air temperature difference, so psi_m, psi_h and Gva
+depend on each other and are iterated for all rows at once.  Rows that have
+converged are dropped from later iterations.
+"""
+
+import numpy as np
+
+from constants import vkk, gr_acc, cp_air
+
+# fields of the structured array returned by calc_Gva_stability
+STABILITY_DTYPE = np.dtype([('Gva', 'float64'),
+                            ('psi_m', 'float64'),
+                            ('psi_h', 'float64'),
+                            ('zeta', 'float64'),
+                            ('iterations', 'int32'),
+                            ('converged', 'bool')])
+
+
+def _air_and_roughness(z, h, P_ref, T_ref):
+    """Molar density of air, and log terms for momentum and heat"""
+    # molar density of air (mol m-3)
+    rho_air = 44.6 * np.asarray(P_ref) * 273.15
+    rho_air = rho_air / (101.3 * (273.15 + np.asarray(T_ref)))
+
+    # zero-plane displacement and roughness lengths (Campbell and Norman
+    # 1998, Eq:5.2, 5.3 and 7.19)
+    d = 0.65 * h
+    zm = 0.1 * h
+    zh = 0.2 * zm
+
+    return rho_air, z - d, np.log((z - d) / zm), np.log((z - d) / zh)
+
+
+def calc_Gva(z, h, u_ref, P_ref, T_ref):
+    """
+    Calculate aerodynamic conductance (mol m-2 s-1) for every time step,
+    assuming neutral stability.
+
+    Args:
+      z: height of instruments on tower (reference height) (m)
+      h: canopy height (m)
+      u_ref: wind speed @ reference height (m s-1), array
+      P_ref: atomspheric pressure @ reference height (kPa), array
+      T_ref: air temperature @ reference height (Celcius), array
+    Returns:
+      Array of Gva.
+    """
+    rho_air, zd, log_m, log_h = _air_and_roughness(z, h, P_ref, T_ref)
+    return vkk ** 2 * rho_air * np.asarray(u_ref) / (log_m * log_h)
+
+
+def stability_corrections(zeta):
+    """
+    Diabatic correction factors psi_m and psi_h for the stability parameter
+    zeta (Campbell and Norman 1998, Eq:7.26, 7.27)
+    """
+    zeta = np.asarray(zeta, dtype='float64')
+    stable = zeta >= 0
+
+    psi_h = np.where(stable,
+                     6 * np.log1p(np.maximum(zeta, 0)),
+                     -2 * np.log((1 + np.sqrt(1 - 16 * np.minimum(zeta, 0)))
+                                 / 2))
+    psi_m = np.where(stable, psi_h, 0.6 * psi_h)
+    return psi_m, psi_h
+
+
+def calc_Gva_stability(z, h, u_ref, P_ref, T_ref, T_surf,
+                       zeta_range=(-5.0, 2.0),
+                       tol=1e-6,
+                       max_iter=50,
+                       relax=1.0):
+    """
+    Calculate aerodynamic conductance with Monin-Obukhov stability
+    corrections for every time step.
+
+    Args:
+      z: height of instruments on tower (reference height) (m)
+      h: canopy height (m)
+      u_ref: wind speed @ reference height (m s-1), array
+      P_ref: atomspheric pressure @ reference height (kPa), array
+      T_ref: air temperature @ reference height (Celcius), array
+      T_surf: surface temperature (Celcius), array
+      zeta_range: limits of the stability parameter, which keep very
+                  stable nights from shutting off turbulent exchange
+      tol: change in zeta below which a row has converged
+      max_iter: largest number of iterations
+      relax: weight of the new zeta in each update.  Values < 1 damp
+             oscillations at the cost of more iterations
+    Returns:
+      Structured array with the fields of STABILITY_DTYPE.
+    """
+    rho_air, zd, log_m, log_h = _air_and_roughness(z, h, P_ref, T_ref)
+    u_ref, T_ref, T_surf, rho_air, zd = [
+        a.ravel() for a in np.broadcast_arrays(
+            *[np.asarray(x, dtype='float64') for x in
+              (u_ref, T_ref, T_surf, rho_air, zd)])]
+    n = u_ref.size
+
+    out = np.zeros(n, dtype=STABILITY_DTYPE)
+    zeta = np.zeros(n)
+    active = np.arange(n)
+
+    for iteration in range(1, max_iter + 1):
+        psi_m, psi_h = stability_corrections(zeta[active])
+        u, rho = u_ref[active], rho_air[active]
+
+        Gva = vkk ** 2 * rho * u / ((log_m + psi_m) * (log_h + psi_h))
+        out['Gva'][active] = Gva
+        out['psi_m'][active] = psi_m
+        out['psi_h'][active] = psi_h
+        out['iterations'][active] = iteration
+
+        # friction velocity, sensible heat flux and the resulting stability
+        # parameter (Campbell and Norman 1998, Eq:7.24, 7.21)
+        u_star = vkk * u / (log_m + psi_m)
+        H = cp_air * Gva * (T_surf[active] - T_ref[active])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            zeta_new = -vkk * gr_acc * zd[active] * H
+            zeta_new /= rho * cp_air * (T_ref[active] + 273.15) * u_star ** 3
+        zeta_new = np.clip(np.nan_to_num(zeta_new), *zeta_range)
+
+        done = np.abs(zeta_new - zeta[active]) <= tol * (1 + np.abs(zeta_new))
+        out['converged'][active[done]] = True
+        out['zeta'][active] = zeta[active]
+
+        active = active[~done]
+        if active.size == 0:
+            break
+        zeta[active] += relax * (zeta_new[~done] - zeta[active])
+
+    return out
@@ -54,10 +54,10 @@ def calc_Gva(z, h, u_ref, P_ref, T_ref):
     # -------------------------#
     # Calculate main equation #
     # -------------------------#
-    logzd = log(z - d)  # Recurring calculation in equation below
+    zd = z - d  # Recurring calculation in equation below
 
-    Gva = (log / zm) + psi_m
-    Gva *= ((logzd / zh) + psi_h)
-    Gva = (k ^ 2 * rho_air * u_ref) / Gva
+    Gva = log(zd / zm) + psi_m
+    Gva *= (log(zd / zh) + psi_h)
+    Gva = (k ** 2 * rho_air * u_ref) / Gva
 
     return Gva
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""
+Created October 18, 2026
+
+Batched curve fitting with analytic Jacobians.
+
+The empirical modules fit small models one dataset at a time with
+scipy.optimize.curve_fit and finite-difference Jacobians:
+
+    sigmoid     water_stress_module.sigmoid          100 / (1 + a exp(b x))
+    gs_ref      gs_ref_module.fit_func               ref - 0.6 ref log(x)
+    gauss       XylemScalar.__gauss                  a exp(-0.5 ((x - b) / c)^2)
+    xs_sigmoid  XylemScalar.__sigmoid                1 / (1 + a2 exp(b2 x))
+
+MODELS holds each model with its analytic Jacobian, in the (x, *params)
+form curve_fit expects, so single fits can pass jac= directly.  fit_batch
+fits many independent datasets (per tree, plot or species) of one model at
+once with a Levenberg-Marquardt iteration vectorized over the datasets, and
+reports the parameters, covariance and convergence status of every dataset.
+The covariance is scaled by the residual variance like curve_fit's default.
+"""
+
+import numpy as np
+
+
+def sigmoid(x, a, b):
+    """Water stress sigmoid, see water_stress_module.sigmoid"""
+    return 100 / (1 + a * np.exp(b * x))
+
+
+def sigmoid_jac(x, a, b):
+    """Jacobian of sigmoid with respect to (a, b)"""
+    # the clipped exponent keeps e finite, so 0 * inf cannot occur
+    e = np.exp(np.clip(b * x, -700, 700))
+    d = -100 / (1 + a * e) ** 2
+    return np.stack(np.broadcast_arrays(d * e, d * a * x * e), axis=-1)
+
+
+def gs_ref(x, ref):
+    """Gs_ref model, see gs_ref_module.fit_func"""
+    return ref - (0.6 * ref) * np.log(x)
+
+
+def gs_ref_jac(x, ref):
+    """Jacobian of gs_ref with respect to ref"""
+    dx = np.broadcast_to(1 - 0.6 * np.log(x), np.broadcast(x, ref).shape)
+    return dx[..., None]
+
+
+def gauss(x, a, b, c):
+    """Blue stain growth rate, see XylemScalar.__gauss"""
+    return a * np.exp(-0.5 * ((x - b) / c)**2)
+
+
+def gauss_jac(x, a, b, c):
+    """Jacobian of gauss with respect to (a, b, c)"""
+    z = (x - b) / c
+    e = np.exp(-0.5 * z**2)
+    return np.stack(np.broadcast_arrays(e, a * e * z / c, a * e * z**2 / c),
+                    axis=-1)
+
+
+def xs_sigmoid(x, a2, b2):
+    """Xylem scalar sigmoid, see XylemScalar.__sigmoid"""
+    return 1 / (1 + a2 * np.exp(b2 * x))
+
+
+def xs_sigmoid_jac(x, a2, b2):
+    """Jacobian of xs_sigmoid with respect to (a2, b2)"""
+    e = np.exp(np.clip(b2 * x, -700, 700))
+    d = -1 / (1 + a2 * e) ** 2
+    return np.stack(np.broadcast_arrays(d * e, d * a2 * x * e), axis=-1)
+
+
+# model name: (function, Jacobian, number of parameters)
+MODELS = {'sigmoid': (sigmoid, sigmoid_jac, 2),
+          'gs_ref': (gs_ref, gs_ref_jac, 1),
+          'gauss': (gauss, gauss_jac, 3),
+          'xs_sigmoid': (xs_sigmoid, xs_sigmoid_jac, 2)}
+
+
+def fit_dtype(n_params):
+    """dtype of the records returned by fit_batch for n_params parameters"""
+    return np.dtype([('params', 'float64', (n_params,)),
+                     ('covariance', 'float64', (n_params, n_params)),
+                     ('cost', 'float64'),
+                     ('n_obs', 'int64'),
+                     ('iterations', 'int32'),
+                     ('converged', 'bool')])
+
+
+def pad(datasets, fill=np.nan):
+    """
+    Stack a list of 1-D arrays of different lengths into an
+    (n_datasets x max_length) array, filling the ends with fill.
+    """
+    out = np.full((len(datasets), max(len(d) for d in datasets)), fill)
+    for i, d in enumerate(datasets):
+        out[i, :len(d)] = d
+    return out
+
+
+def fit_batch(model, x, y, p0, max_iter=200, ftol=1e-10, xtol=1e-10,
+              gtol=1e-10, lam=1e-3):
+    """
+    Fit one model to many independent datasets at once.
+
+    Args:
+        model: name of the model in MODELS
+        x, y: (n_datasets x n_points) arrays, or lists of 1-D arrays of
+              different lengths.  NaN marks missing points.
+        p0: initial parameters, (n_params,) or (n_datasets x n_params)
+        max_iter: largest number of iterations
+        ftol: relative reduction of the sum of squares below which a
+              dataset has converged
+        xtol: relative parameter change below which a dataset has converged
+        gtol: largest cosine between the residuals and any column of the
+              Jacobian at which a dataset has converged
+        lam: initial Levenberg-Marquardt damping
+
+    Returns:
+        Structured array with one record per dataset and the fields of
+        fit_dtype(n_params).  'converged' is False for datasets that hit
+        max_iter or have fewer points than parameters.
+    """
+    func, jac, n_params = MODELS[model]
+
+    if not isinstance(x, np.ndarray):
+        x = pad(x)
+    if not isinstance(y, np.ndarray):
+        y = pad(y)
+    x, y = np.broadcast_arrays(np.atleast_2d(np.asarray(x, dtype='float64')),
+                               np.atleast_2d(np.asarray(y, dtype='float64')))
+    n_sets = x.shape[0]
+
+    # missing points get zero weight and a harmless x
+    w = (np.isfinite(x) & np.isfinite(y)).astype('float64')
+    x = np.where(w > 0, x, 1.0)
+    y = np.where(w > 0, y, 0.0)
+
+    p = np.array(np.broadcast_to(np.asarray(p0, dtype='float64'),
+                                 (n_sets, n_params)))
+
+    def residuals(idx, params):
+        with np.errstate(over='ignore', invalid='ignore'):
+            pred = func(x[idx], *[params[:, j:j + 1]
+                                  for j in range(n_params)])
+        return w[idx] * (y[idx] - pred)
+
+    def jacobian(idx, params):
+        J = jac(x[idx], *[params[:, j:j + 1] for j in range(n_params)])
+        return w[idx][..., None] * J
+
+    out = np.zeros(n_sets, dtype=fit_dtype(n_params))
+    out['n_obs'] = w.sum(axis=1)
+
+    everything = np.arange(n_sets)
+    r = residuals(everything, p)
+    cost = np.einsum('dn,dn->d', r, r)
+    damping = np.full(n_sets, lam)
+    nu = np.full(n_sets, 2.0)
+    active = everything[out['n_obs'] >= n_params]
+
+    for iteration in range(1, max_iter + 1):
+        if active.size == 0:
+            break
+        out['iterations'][active] = iteration
+
+        J = jacobian(active, p[active])
+        r = residuals(active, p[active])
+        JtJ = np.einsum('dnp,dnq->dpq', J, J)
+        g = np.einsum('dnp,dn->dp', J, r)
+        diag = np.einsum('dpp->dp', JtJ)
+
+        # converged when the residuals are orthogonal to the columns of the
+        # Jacobian (gtol test of MINPACK)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cosine = np.abs(g) / np.sqrt(diag * cost[active, None])
+        stationary = np.all(cosine <= gtol, axis=1) | (cost[active] == 0)
+        out['converged'][active[stationary]] = True
+        active, J, r, JtJ, g, diag = [v[~stationary] for v in
+                                      (active, J, r, JtJ, g, diag)]
+        if active.size == 0:
+            break
+
+        # Marquardt scaling by the diagonal, kept positive for parameters
+        # the data do not constrain.  Datasets with such parameters cannot
+        # converge.
+        identified = np.all(diag > 0, axis=1)
+        diag = np.maximum(diag, 1e-12 * diag.max(axis=1, keepdims=True))
+        A = JtJ + damping[active, None, None] * (diag[:, :, None] *
+                                                 np.eye(n_params))
+        try:
+            step = np.linalg.solve(A, g[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            step = np.einsum('dpq,dq->dp', np.linalg.pinv(A), g)
+
+        p_new = p[active] + step
+        r_new = residuals(active, p_new)
+        with np.errstate(over='ignore', invalid='ignore'):
+            cost_new = np.einsum('dn,dn->d', r_new, r_new)
+        better = np.isfinite(cost_new) & (cost_new <= cost[active])
+
+        # gain ratio of the actual to the predicted reduction, which sets
+        # the damping (Nielsen 1999)
+        reduction = np.where(better, cost[active] - cost_new, 0.0)
+        predicted = np.einsum('dp,dp->d', step, 2 * g -
+                              np.einsum('dpq,dq->dp', JtJ, step))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rho = np.where(predicted > 0, reduction / predicted, 0.0)
+
+        # converged when both the actual and the predicted reduction are
+        # tiny (ftol test of MINPACK), or a nearly undamped (Gauss-Newton)
+        # step hardly changes the parameters
+        f_small = ((reduction <= ftol * cost[active]) &
+                   (predicted <= ftol * cost[active]) & (rho <= 2))
+        x_small = (np.all(np.abs(step) <= xtol * (np.abs(p[active]) + xtol),
+                          axis=1) & (damping[active] < 1))
+        done = better & identified & (f_small | x_small)
+
+        p[active[better]] = p_new[better]
+        cost[active[better]] = cost_new[better]
+        damping[active] = np.where(
+            better,
+            damping[active] * np.maximum(1 / 3, 1 - (2 * rho - 1) ** 3),
+            damping[active] * nu[active])
+        nu[active] = np.where(better, 2.0, 2 * nu[active])
+
+        out['converged'][active[done]] = True
+        active = active[~done & (damping[active] < 1e16)]
+
+    # covariance from the Jacobian at the solution, like curve_fit
+    J = jacobian(everything, p)
+    JtJ = np.einsum('dnp,dnq->dpq', J, J)
+    finite = np.all(np.isfinite(JtJ), axis=(1, 2))
+    dof = np.maximum(out['n_obs'] - n_params, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s2 = np.where(dof > 0, cost / dof, np.inf)
+    out['covariance'] = np.nan
+    out['covariance'][finite] = (np.linalg.pinv(JtJ[finite]) *
+                                 s2[finite, None, None])
+    out['params'] = p
+    out['cost'] = cost
+
+    return out
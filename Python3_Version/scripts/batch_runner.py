@@ -0,0 +1,214 @@
+"""
+Created October 18, 2026
+
+Parallel batch runs of the simulation pipeline.
+
+run_batch distributes independent jobs, e.g. one per site or parameter set,
+over a ProcessPoolExecutor.  The forcing tables are copied once into
+multiprocessing.shared_memory blocks, and every worker process attaches to
+them when it starts, so jobs receive column views of the same pages instead
+of pickled copies and no worker re-reads a forcing file.
+
+Every job runs Pipeline(**params).run on one of the shared forcings.  A job
+that raises is reported as failed with its traceback without stopping the
+others.  If a worker process dies, the pool breaks and the jobs that had not
+finished are reported as failed.  BatchResults collects the outcome of
+every job as it finishes; the results of successful jobs are either
+returned (optionally summarized by a function of the job's output) or
+written to a ResultsStore per job.
+"""
+
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from time import perf_counter
+
+import numpy as np
+
+from results_store import ResultsStore
+from simulation import Pipeline
+
+# forcing columns attached in a worker process, by forcing name
+_forcing = {}
+
+# shared memory blocks of the worker process, kept open while it runs
+_blocks = []
+
+
+class SharedForcing(object):
+    """
+    Forcing columns in one shared memory block.
+
+    Args:
+        columns(dictionary):
+            Column name: 1-D array, all of the same length, e.g. from
+            simulation.read_forcing or forcing_cache.load_forcing.
+
+    Attributes:
+        descriptor(tuple):
+            (block name, column names, number of rows), which is all a
+            worker needs to attach.
+    """
+
+    def __init__(self, columns):
+        names = tuple(columns)
+        n = len(columns[names[0]])
+
+        self.shm = shared_memory.SharedMemory(create=True,
+                                              size=max(len(names) * n * 8, 1))
+        table = np.ndarray((len(names), n), dtype='float64',
+                           buffer=self.shm.buf)
+        for i, name in enumerate(names):
+            table[i] = columns[name]
+        del table
+
+        self.descriptor = (self.shm.name, names, n)
+
+    def close(self):
+        """Release and remove the block"""
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(descriptor):
+    """
+    Columns of a SharedForcing as read-only views of the shared block.
+
+    The block stays attached for the life of the process.
+    """
+    name, names, n = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    _blocks.append(shm)
+
+    table = np.ndarray((len(names), n), dtype='float64', buffer=shm.buf)
+    table.flags.writeable = False
+    return {column: table[i] for i, column in enumerate(names)}
+
+
+def _init_worker(descriptors):
+    """Attach every shared forcing once per worker process"""
+    for key, descriptor in descriptors.items():
+        _forcing[key] = attach(descriptor)
+
+
+def _run_job(forcing, params, summarize, store_path):
+    """
+    Run one job in a worker.
+
+    Returns:
+        ('ok', value, seconds) or ('failed', traceback, seconds).
+    """
+    start = perf_counter()
+    try:
+        out = Pipeline(**params).run(_forcing[forcing])
+        if store_path is not None:
+            ResultsStore(store_path).append(out)
+            value = store_path
+        elif summarize is not None:
+            value = summarize(out)
+        else:
+            value = out
+        return 'ok', value, perf_counter() - start
+    except Exception:
+        return 'failed', traceback.format_exc(), perf_counter() - start
+
+
+class BatchResults(object):
+    """
+    Outcome of every job of a batch.
+
+    Attributes:
+        results(dictionary):
+            Job id: dictionary with 'status' ('ok' or 'failed'), 'value'
+            (the job's output, summary or store path), 'error' (traceback
+            of a failed job) and 'seconds'.
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    def add(self, job_id, status, value, seconds):
+        """Record the outcome of one job"""
+        self.results[job_id] = {'status': status,
+                                'value': value if status == 'ok' else None,
+                                'error': value if status != 'ok' else None,
+                                'seconds': seconds}
+
+    @property
+    def succeeded(self):
+        """Values of the successful jobs, by job id"""
+        return {job_id: r['value'] for job_id, r in self.results.items()
+                if r['status'] == 'ok'}
+
+    @property
+    def failed(self):
+        """Tracebacks of the failed jobs, by job id"""
+        return {job_id: r['error'] for job_id, r in self.results.items()
+                if r['status'] != 'ok'}
+
+
+def run_batch(jobs,
+              forcing,
+              n_workers=None,
+              summarize=None,
+              store_dir=None,
+              callback=None):
+    """
+    Run simulation jobs in a process pool on shared forcing.
+
+    Args:
+        jobs: dictionary of job id: job.  A job is a dictionary of Pipeline
+              keyword arguments, plus 'forcing' naming its forcing when
+              there are several.
+        forcing: dictionary of columns shared by all jobs, or dictionary of
+                 forcing name: dictionary of columns for several sites
+        n_workers: number of processes, one per CPU by default
+        summarize: module-level function applied to the output of every job
+                   in its worker, so only the summary is sent back
+        store_dir: write the output of every job to a ResultsStore in
+                   store_dir/<job id> instead of sending it back
+        callback: function called with (job id, result record) as jobs
+                  finish
+
+    Returns:
+        BatchResults.
+    """
+    if all(isinstance(v, np.ndarray) for v in forcing.values()):
+        forcing = {None: forcing}
+
+    shared = {}
+    collector = BatchResults()
+    try:
+        for key, columns in forcing.items():
+            shared[key] = SharedForcing(columns)
+        descriptors = {key: s.descriptor for key, s in shared.items()}
+        default = next(iter(forcing)) if len(forcing) == 1 else None
+
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 initializer=_init_worker,
+                                 initargs=(descriptors,)) as pool:
+            futures = {}
+            for job_id, job in jobs.items():
+                params = dict(job)
+                key = params.pop('forcing', default)
+                store_path = (None if store_dir is None else
+                              os.path.join(store_dir, str(job_id)))
+                futures[pool.submit(_run_job, key, params, summarize,
+                                    store_path)] = job_id
+
+            for future in as_completed(futures):
+                job_id = futures[future]
+                try:
+                    collector.add(job_id, *future.result())
+                except Exception:
+                    # the worker died or the result could not be sent back
+                    collector.add(job_id, 'failed', traceback.format_exc(),
+                                  float('nan'))
+                if callback is not None:
+                    callback(job_id, collector.results[job_id])
+    finally:
+        for s in shared.values():
+            s.close()
+
+    return collector
@@ -10,6 +10,8 @@ from os import chdir
 import numpy as np
 from scipy.optimize import curve_fit
 
+from batch_fit import gauss_jac, xs_sigmoid_jac
+
 
 class XylemScalar(object):
     """
@@ -41,8 +43,14 @@ class XylemScalar(object):
 
 
     Attributes:
-        xs_sim(numpy array):
-            Stores simulated xylem scalars.
+        sim(numpy array):
+            Simulated xylem scalar of every day, including appended days.
+
+        biomass(numpy array):
+            Simulated cumulative blue stain fungal biomass of every day.
+
+        temp(numpy array):
+            Mean daily air temperature of every day.
 
         xs_obs(tuple):
             Stores observed xylem scalars (faster and immutable).
@@ -53,20 +61,112 @@ class XylemScalar(object):
         coeff(array):
             Stores optimized coefficients for xylem scalar calculation.
 
+        covar(dictionary):
+            Stores the covariance matrices of the fits, 'gauss' for
+            (a, b, c) and 'xs' for (a2, b2).
+
+        dates(numpy array):
+            Dates of every day as mm/dd/yyyy, None for appended days
+            without a date.
+
+    Examples:
+        Add the days of a daily ingest without refitting:
+            xs = XylemScalar(work_dir, csv_gr, csv_sfd)
+            xs.append(new_temps, new_dates)
+            xs.sim[-len(new_temps):]
+
     """
 
+    # initial number of days the buffers can hold
+    capacity = 512
+
     def __init__(self, work_dir, csv_gr, csv_sfd):
         """
         Stores information from Xylem Scalar module.
         """
-        self.sim = []
         self.obs = ()
         self.graph = None
         self.coeff = {}
-        self.dates = ()
+        self.covar = {}
+
+        # daily state in buffers that grow geometrically, so appending a day
+        # takes constant amortized time; the public arrays are views of the
+        # first n days
+        self.__n = 0
+        self.__days = np.zeros(self.capacity, dtype=[('temp', 'float64'),
+                                                     ('biomass', 'float64'),
+                                                     ('sim', 'float64')])
+        self.__dates = np.empty(self.capacity, dtype=object)
 
         self.__xylem_scaling_module(work_dir, csv_gr, csv_sfd)
 
+    @property
+    def sim(self):
+        """Simulated xylem scalar of every day"""
+        return self.__days['sim'][:self.__n]
+
+    @property
+    def biomass(self):
+        """Simulated cumulative blue stain fungal biomass of every day"""
+        return self.__days['biomass'][:self.__n]
+
+    @property
+    def temp(self):
+        """Mean daily air temperature of every day"""
+        return self.__days['temp'][:self.__n]
+
+    @property
+    def dates(self):
+        """Date of every day"""
+        return self.__dates[:self.__n]
+
+    def append(self, temp, dates=None):
+        """
+        Add days to the simulation with the fitted coefficients.
+
+        Biomass keeps accumulating from the last day, so only the new days
+        are computed.
+
+        Args:
+            temp: mean daily air temperature (degrees C) of the new days
+            dates: dates of the new days as mm/dd/yyyy
+
+        Returns:
+            Simulated xylem scalar of the new days.
+        """
+        temp = np.atleast_1d(np.asarray(temp, dtype='float64'))
+        k = temp.size
+        start = self.__days['biomass'][self.__n - 1] if self.__n else 0.0
+
+        self.__store(temp, start + np.cumsum(self.__growth(temp)), dates)
+        return self.sim[-k:] if k else self.sim[:0]
+
+    def __store(self, temp, biomass, dates):
+        """Write days to the end of the buffers, growing them if needed"""
+        k = temp.size
+        n = self.__n
+        if n + k > len(self.__days):
+            capacity = max(2 * len(self.__days), n + k)
+            days = np.zeros(capacity, dtype=self.__days.dtype)
+            days[:n] = self.__days[:n]
+            self.__days = days
+            self.__dates = np.concatenate(
+                (self.__dates[:n], np.empty(capacity - n, dtype=object)))
+
+        self.__days['temp'][n:n + k] = temp
+        self.__days['biomass'][n:n + k] = biomass
+        self.__days['sim'][n:n + k] = self.__sigmoid(biomass,
+                                                     self.coeff['a2'],
+                                                     self.coeff['b2'])
+        if dates is not None:
+            self.__dates[n:n + k] = dates
+        self.__n = n + k
+
+    def __growth(self, temp):
+        """Daily blue stain fungal growth at temperature temp"""
+        return self.__gauss(temp, self.coeff['a'], self.coeff['b'],
+                            self.coeff['c'])
+
     def __xylem_scaling_module(self, work_dir, csv_gr, csv_sfd):
         """
         Look in the readme to see how this works, for now.
@@ -133,9 +233,8 @@ class XylemScalar(object):
                   " is in the correct format.")
             print(e)
 
-        self.sim = self.__xylem_scalar(temp_gr, sf_decline)
+        self.__xylem_scalar(temp_gr, sf_decline)
         self.obs = sf_decline['xs_obs']
-        self.dates = sf_decline['dates']
 
     # Define model function for Gaussian fit
     def __gauss(self, x, a, b, c):
@@ -162,27 +261,29 @@ class XylemScalar(object):
             sf_decline = 2-column array with observed mean daily air 
                         temperatures and mean daily percent sap flux decline
 
-        output:
-        xs_sim = simulated water stress model
+        The simulated days are stored in the buffers behind sim, biomass
+        and temp.
         """
         # fit blue stain growth model paras to 'temp_gr' data using a Guassian
-        # function.  Covariance is unused.
+        # function.
         bs_gr_coef = np.asarray([450, 25, 5], dtype='float16')
         bs_gr_coef, bs_gr_covar = curve_fit(self.__gauss,
                                             temp_gr['temp_obs'],
                                             temp_gr['gr_obs'],
-                                            p0=bs_gr_coef)
-        self.coeff['a'] = a = bs_gr_coef[0]
-        self.coeff['b'] = b = bs_gr_coef[1]
-        self.coeff['c'] = c = bs_gr_coef[2]
+                                            p0=bs_gr_coef,
+                                            jac=gauss_jac)
+        self.coeff['a'] = bs_gr_coef[0]
+        self.coeff['b'] = bs_gr_coef[1]
+        self.coeff['c'] = bs_gr_coef[2]
+        self.covar['gauss'] = bs_gr_covar
 
         # simulate cumulative daily blue stain fungal biomass
-        # as function of temperature-dependent growth rate
+        # as function of temperature-dependent growth rate, starting from
+        # no biomass on the first day
         temp = sf_decline['at_obs']
-        sim_bs_bm = np.empty_like(temp)
-        for i in range(1, sim_bs_bm.shape[0]):
-            sim_bs_bm[i] = sim_bs_bm[i - 1] + a * \
-                np.exp(-0.5 * ((temp[i] - b) / c)**2)
+        growth = self.__growth(temp)
+        growth[0] = 0.0
+        sim_bs_bm = np.cumsum(growth)
 
         # fit model of simulated blue stain fungal growth to percent sapflux decline
         # using a sigmoid function (numerator is set to 1, in order to get
@@ -191,12 +292,12 @@ class XylemScalar(object):
         xs_coef, xs_covar = curve_fit(self.__sigmoid,
                                       sim_bs_bm,
                                       sf_decline['xs_obs'],
-                                      p0=xs_coef)
-        self.coeff['a2'] = a2 = xs_coef[0]
-        self.coeff['b2'] = b2 = xs_coef[1]
+                                      p0=xs_coef,
+                                      jac=xs_sigmoid_jac)
+        self.coeff['a2'] = xs_coef[0]
+        self.coeff['b2'] = xs_coef[1]
+        self.covar['xs'] = xs_covar
 
         # simulate the decline in sap flux as a function of simulated
         # blue stain fungal biomass
-        sim = 1 / (1 + a2 * np.exp(b2 * sim_bs_bm))
-
-        return sim
+        self.__store(temp, sim_bs_bm, sf_decline['dates'])
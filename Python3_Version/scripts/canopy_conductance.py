@@ -16,7 +16,7 @@
 #                                 (0 to infinity)*
 # sig <- 5.67E-8       *Stefan-Boltzmann constant (W m-2 K-4)
 # -------------------------------------------------------------------------------------------
-from math import exp, sqrt, pi, sin, cos
+from math import exp, sqrt, pi, sin, cos, tan, log
 import scipy.integrate as integrate
 
 def LAI_sun_calc(LAI_total, Pcc, Kbe):
@@ -36,10 +36,13 @@ def LAI_shade_calc(LAI_total, LAI_sun):
 
 # NOTE: z_angle is calculated in radiation module.
 def Kbe_calc(omega, x_ratio, z_angle):
-    """Calculate elipsoid beam light extinction coefficient"""
-    Kbe = omega * (x_ratio ^ 2) + tan(z_angle)
-    Kbe = Kbe * tan(z_angle) ^ 0.5
-    Kbe = Kbe / (x_ratio + 1.774 * (x_ratio + 1.182) ^ -0.733)
+    """
+    Calculate elipsoid beam light extinction coefficient
+    (Campbell and Norman 1998, Eq:15.4, scaled by the clumping factor)
+    """
+    Kbe = sqrt(x_ratio ** 2 + tan(z_angle) ** 2)
+    Kbe = Kbe / (x_ratio + 1.774 * (x_ratio + 1.182) ** -0.733)
+    Kbe = omega * Kbe
     return Kbe
 
 
@@ -133,7 +136,7 @@ def Qd_PAR_calc(Qod_PAR, alpha_PAR, Kd, LAI_total):
 
 def Qsc_PAR_calc(Qob_PAR, alpha_PAR, Kbe, LAI_total):
     """Calculate incident scattered PAR (W m-2)"""
-    Qsc_PAR *= exp(-sqrt(alpha_PAR) * Kbe * LAI_total)
+    Qsc_PAR = Qob_PAR * exp(-sqrt(alpha_PAR) * Kbe * LAI_total)
     Qsc_PAR -= Qob_PAR * exp(-Kbe * LAI_total)
     Qsc_PAR /= 2
 
@@ -200,16 +203,21 @@ def tau_be_calc(Kbe, LAI_total):
 
 # ATTEMPT #1: Trying to emulate the C++ version approach:
 
-def tau_d_calc(tau_be, z_angle):
-
+def tau_d_calc(LAI_total, omega, x_ratio):
+    """
+    Calculate diffuse light transmissivity with the 90 step left sum used
+    in simulator.cpp
+    """
     steps = 90
-    max_z_angle = pi() / 2
+    max_z_angle = pi / 2
     dz_angle = max_z_angle / steps
     z_angle = 0
     integral = 0
 
     while z_angle < max_z_angle:
+        tau_be = tau_be_calc(Kbe_calc(omega, x_ratio, z_angle), LAI_total)
         integral += tau_be * sin(z_angle) * cos(z_angle) * dz_angle
+        z_angle += dz_angle
 
     tau_d = 2.0 * integral
 
@@ -217,15 +225,19 @@ def tau_d_calc(tau_be, z_angle):
 
 
 # ATTEMPT #2: Trying to R 'integrate' function approach:
-def num_int_func(z_angle, tau_be):
-    num_int = tau_be
+def num_int_func(z_angle, LAI_total, omega, x_ratio):
+    num_int = tau_be_calc(Kbe_calc(omega, x_ratio, z_angle), LAI_total)
     num_int = num_int * sin(z_angle) * cos(z_angle)
     return num_int
 
-# TODO: Dave, so I'm lost on this.  This is the correct structure, but I'm not sure
-# TODO: (cont) which parameters are needed here???
-def tau_d_calc(tau_be, z_angle, LAI_total):
-    num_int = integrate.quad(num_int_func, 0, pi / 2, args=(LAI_total, Kbe))
+
+def tau_d_quad_calc(LAI_total, omega, x_ratio):
+    """
+    Calculate diffuse light transmissivity with adaptive quadrature.  See
+    tau_d_table.py for a tabulated version of this integral.
+    """
+    num_int, abserr = integrate.quad(num_int_func, 0, pi / 2,
+                                     args=(LAI_total, omega, x_ratio))
     tau_d = num_int * 2
     return tau_d
 
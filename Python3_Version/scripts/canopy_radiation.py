@@ -0,0 +1,117 @@
+"""
+Created October 18, 2026
+
+Array kernel for the sun/shade (two big leaf) canopy radiation in
+canopy_conductance.py.
+
+two_big_leaf evaluates Kbe_calc, LAI_sun_calc, LAI_shade_calc, Qd_PAR_calc,
+Qsc_PAR_calc, Qd_NIR_calc, Qsc_NIR_calc, Q_sun_calc, Q_shd_calc,
+PAR_Ps_sun_calc and PAR_Ps_shd_calc for every time step at once.  The beam
+transmissivity exp(-Kbe * LAI_total) and the diffuse terms, which only depend
+on the canopy parameters, are computed once and shared by all of them.
+"""
+
+import numpy as np
+
+import fixed_params
+from tau_d_table import Kbe_calc, get_tau_d_table
+
+# Kbe grows without bound as the sun reaches the horizon and tan(z_angle)**2
+# folds back for a sun below it, so zenith angles are capped here.
+max_z_angle = np.deg2rad(89.5)
+
+# fields of the structured array returned by two_big_leaf.  Radiation is in
+# W m^-2 (per unit leaf area for Q_*, PAR_Ps_*)
+CANOPY_DTYPE = np.dtype([('Kbe', 'float64'),
+                         ('LAI_sun', 'float64'),
+                         ('LAI_shd', 'float64'),
+                         ('Qd_PAR', 'float64'),
+                         ('Qsc_PAR', 'float64'),
+                         ('Qd_NIR', 'float64'),
+                         ('Qsc_NIR', 'float64'),
+                         ('Q_sun', 'float64'),
+                         ('Q_shd', 'float64'),
+                         ('PAR_Ps_sun', 'float64'),
+                         ('PAR_Ps_shd', 'float64')])
+
+
+def Kd_calc(tau_d, LAI_total):
+    """Calculate diffuse light extinction coefficient"""
+    return -np.log(tau_d) / LAI_total
+
+
+def two_big_leaf(z_angle,
+                 rad,
+                 LAI_total=fixed_params.LAI_total,
+                 Pcc=fixed_params.Pcc,
+                 omega=fixed_params.omega,
+                 x_ratio=fixed_params.x_ratio,
+                 alpha_PAR=fixed_params.alpha_PAR,
+                 alpha_NIR=fixed_params.alpha_NIR,
+                 tau_d=None):
+    """
+    Calculate sunlit/shaded leaf area and absorbed radiation.
+
+    Args:
+        z_angle: zenith angle (radians), see solar_geometry
+        rad: structured array of partitioned above canopy radiation, see
+             radiation_partition.partition_radiation
+        LAI_total: total leaf area index
+        Pcc: 'percent' canopy coverage (0-1)
+        omega: canopy clumping factor (0-1)
+        x_ratio: leaf angle distribution parameter
+        alpha_PAR: leaf absorptivity in PAR
+        alpha_NIR: leaf absorptivity in NIR
+        tau_d: diffuse transmissivity of the canopy.  Looked up in the
+               tau_d table if not given.
+
+    Returns:
+        Structured array with the fields of CANOPY_DTYPE, one record per
+        time step.
+    """
+    z_angle = np.minimum(z_angle, max_z_angle)
+    out = np.empty(np.broadcast(z_angle, rad).shape, dtype=CANOPY_DTYPE)
+
+    if tau_d is None:
+        tau_d = get_tau_d_table()(LAI_total, omega, x_ratio)
+
+    Kbe = out['Kbe'] = Kbe_calc(omega, x_ratio, z_angle)
+
+    # sunlit and shaded leaf area
+    if Pcc == 1.0:
+        exp_be = np.exp(-Kbe * LAI_total)
+        out['LAI_sun'] = (1 - exp_be) / Kbe
+    else:
+        out['LAI_sun'] = (1 - np.exp(-Kbe * (LAI_total / Pcc))) / Kbe
+        exp_be = np.exp(-Kbe * LAI_total)
+    out['LAI_shd'] = LAI_total - out['LAI_sun']
+
+    # diffuse radiation only depends on the canopy parameters
+    Kd = Kd_calc(tau_d, LAI_total)
+    sqrt_PAR = np.sqrt(alpha_PAR)
+    sqrt_NIR = np.sqrt(alpha_NIR)
+    d_PAR = (1 - np.exp(-sqrt_PAR * Kd * LAI_total)) / (sqrt_PAR * Kd *
+                                                         LAI_total)
+    d_NIR = (1 - np.exp(-sqrt_NIR * Kd * LAI_total)) / (sqrt_NIR * Kd *
+                                                         LAI_total)
+
+    Id = out['Qd_PAR'] = rad['Iod'] * d_PAR
+    Qd_NIR = out['Qd_NIR'] = rad['QodNIR'] * d_NIR
+
+    # scattered radiation
+    Isc = out['Qsc_PAR'] = 0.5 * rad['Iob'] * (
+        np.exp(-sqrt_PAR * Kbe * LAI_total) - exp_be)
+    Qsc_NIR = out['Qsc_NIR'] = 0.5 * rad['QobNIR'] * (
+        np.exp(-sqrt_NIR * Kbe * LAI_total) - exp_be)
+
+    # absorbed radiation
+    PAR_shd = alpha_PAR * (Id + Isc)
+    PAR_sun = PAR_shd + alpha_PAR * Kbe * rad['Iob']
+    NIR_shd = alpha_NIR * (Qd_NIR + Qsc_NIR)
+
+    out['PAR_Ps_sun'] = PAR_sun
+    out['PAR_Ps_shd'] = PAR_shd
+    out['Q_sun'] = PAR_sun + NIR_shd + alpha_NIR * Kbe * rad['QobNIR']
+    out['Q_shd'] = PAR_shd + NIR_shd
+
+    return out
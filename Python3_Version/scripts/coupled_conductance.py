@@ -0,0 +1,161 @@
+"""
+Created October 18, 2026
+
+Batched fixed-point solver closing the loop between canopy conductance and
+photosynthesis.
+
+Gc0_k_module.calc_Gc0_k gives the CO2 conductance of a canopy element before
+photosynthetic limitation, which caps the conductance used by the Farquhar
+quadratics.  When photosynthesis cannot use that much conductance the
+stomata close until the intercellular CO2 concentration (ci) falls to its
+target fraction of the ambient concentration:
+
+    gc = min(Gc0_k, max(An(gc) / (Ca * (1 - ci_ratio)), gc_min))
+
+The tree has no stomatal model that sets conductance from An (Gs_ref,
+gsv0 and Gc0_k respond to D and water potential only), and the quadratics
+already return An for any given conductance, so without some closure the
+feedback from An to conductance is undefined.  A constant ci / Ca is the
+simplest closure that needs no new fitted parameters (Wong et al. 1979
+found it close to 0.7 for well watered C3 plants), and because it only ever
+lowers conductance below Gc0_k, the hydraulic limit stays the one TREES
+computes.
+
+solve_coupled iterates this relation for every time step and canopy element
+at once, using secant steps kept inside the [gc_min, Gc0_k] bracket.  Rows
+that have converged are dropped from later iterations.
+"""
+
+import numpy as np
+
+import farquhar_array as fa
+
+# fields of the structured array returned by solve_coupled
+COUPLED_DTYPE = np.dtype([('gc', 'float64'),
+                          ('ci', 'float64'),
+                          ('J', 'float64'),
+                          ('Av', 'float64'),
+                          ('Aj', 'float64'),
+                          ('An', 'float64'),
+                          ('iterations', 'int32'),
+                          ('converged', 'bool')])
+
+
+def solve_coupled(Gc0,
+                  Ir,
+                  Ca,
+                  Vcmax,
+                  Rd,
+                  Kc,
+                  Ko,
+                  O2,
+                  gammaStar,
+                  Jmax,
+                  phi_J,
+                  theta_J,
+                  ci_ratio=0.7,
+                  gc_min=1e-4,
+                  tol=1e-8,
+                  max_iter=50):
+    """
+    Solve conductance and photosynthesis together for all canopy elements.
+
+    All photosynthesis arguments are as in farquhar_array.photosynthesis and
+    broadcast against each other, so sun and shade elements can be passed
+    together as arrays of shape (2, n_timesteps).  Gc0 must be in the units
+    the Farquhar quadratics use for conductance.
+
+    Args:
+        Gc0: conductance to CO2 prior to photosynthetic limitation
+        ci_ratio: target ratio of intercellular to ambient CO2 when
+                  photosynthesis limits conductance, see the module
+                  docstring
+        gc_min: smallest conductance, used when An <= 0 (e.g. at night)
+        tol: relative change in gc below which an element has converged
+        max_iter: largest number of iterations
+
+    Returns:
+        Structured array with the fields of COUPLED_DTYPE and the broadcast
+        shape of the inputs.  'iterations' holds the number of iterations
+        each element needed and 'converged' is False for elements that hit
+        max_iter.
+    """
+    args = np.broadcast_arrays(*[np.asarray(a, dtype='float64') for a in
+                                 (Gc0, Ir, Ca, Vcmax, Rd, Kc, Ko, O2,
+                                  gammaStar, Jmax, phi_J, theta_J)])
+    shape = args[0].shape
+    (Gc0, Ir, Ca, Vcmax, Rd, Kc, Ko, O2,
+     gammaStar, Jmax, phi_J, theta_J) = [a.ravel() for a in args]
+
+    out = np.zeros(Gc0.size, dtype=COUPLED_DTYPE)
+    out['J'] = J = fa.J_calc(Ir, Jmax, phi_J, theta_J)
+
+    gc_max = np.maximum(Gc0, gc_min)
+    gc = gc_max.copy()
+    active = np.arange(Gc0.size)
+
+    # The fixed point is bracketed by gc_min (residual >= 0) and gc_max
+    # (residual <= 0).  Secant steps are kept inside the bracket, with
+    # bisection as the fall back.
+    lo = np.full(Gc0.size, gc_min)
+    hi = gc_max.copy()
+    lo_evaluated = np.zeros(Gc0.size, dtype='bool')
+    g_prev = np.full(Gc0.size, np.nan)
+    F_prev = np.full(Gc0.size, np.nan)
+
+    for iteration in range(1, max_iter + 1):
+        g = gc[active]
+        Av = fa.quad_Av_calc(g, Ca[active], Vcmax[active], Rd[active],
+                             Kc[active], Ko[active], O2[active],
+                             gammaStar[active])
+        Aj = fa.quad_Aj_calc(g, Ca[active], gammaStar[active], J[active],
+                             Rd[active])
+        An = fa.An_k_calc(Av, Aj, Rd[active])
+
+        out['Av'][active] = Av
+        out['Aj'][active] = Aj
+        out['An'][active] = An
+        out['iterations'][active] = iteration
+
+        g_fix = An / (Ca[active] * (1 - ci_ratio))
+        g_fix = np.minimum(np.maximum(g_fix, gc_min), gc_max[active])
+        F = g_fix - g
+
+        done = np.abs(F) <= tol * g
+        out['converged'][active[done]] = True
+
+        # converged elements keep the conductance their An was computed with
+        keep = ~done
+        active, g, F, g_fix = active[keep], g[keep], F[keep], g_fix[keep]
+        if active.size == 0 or iteration == max_iter:
+            break
+
+        # narrow the bracket
+        up = F > 0
+        lo[active[up]] = g[up]
+        lo_evaluated[active[up]] = True
+        hi[active[~up]] = g[~up]
+        a, b = lo[active], hi[active]
+
+        # secant step on F(g) = g_fix(g) - g, or the plain fixed-point step
+        # on the first iteration
+        dF = F - F_prev[active]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g_new = g - F * (g - g_prev[active]) / dF
+        g_new = np.where(np.isfinite(g_new), g_new, g_fix)
+
+        # steps at or below gc_min try gc_min itself once, other steps that
+        # leave the bracket bisect it
+        to_min = (g_new <= a) & ~lo_evaluated[active]
+        outside = ~((g_new > a) & (g_new < b)) & ~to_min
+        g_new = np.where(to_min, a, np.where(outside, 0.5 * (a + b), g_new))
+        lo_evaluated[active[to_min]] = True
+
+        g_prev[active] = g
+        F_prev[active] = F
+        gc[active] = g_new
+
+    out['gc'] = gc
+    out['ci'] = Ca - out['An'] / gc
+
+    return out.reshape(shape)
@@ -0,0 +1,118 @@
+"""
+Created October 18, 2026
+
+Array API for the Farquhar photosynthesis model in
+Farquhar_module_v_0_5_1.py.
+
+The functions here accept numpy arrays for every argument and solve the
+quadratics for all elements at once.  Sun and shade canopy elements can be
+evaluated in the same call by stacking them along a leading axis, e.g.
+gc0 of shape (2, n_timesteps).  Elements with a negative discriminant are
+masked instead of branched on, and give the same result as the scalar
+functions.
+"""
+
+import numpy as np
+
+# fields of the structured array returned by photosynthesis, all in
+# umol m^-2 s^-1
+PHOTOSYNTHESIS_DTYPE = np.dtype([('J', 'float64'),
+                                 ('Av', 'float64'),
+                                 ('Aj', 'float64'),
+                                 ('An', 'float64')])
+
+
+def _masked_root(aa, bb, det):
+    """(-bb + sqrt(det)) / (2 aa) where det >= 0, zero elsewhere"""
+    valid = det >= 0.0
+    root = (-bb + np.sqrt(np.where(valid, det, 0.0))) / (2.0*aa)
+    return np.where(valid, root, 0.0)
+
+
+def quad_Av_calc(gc0, Ca, Vcmax, Rd, Kc, Ko, O2, gammaStar):
+    """
+    Calculate the RuBisCO-limited assimilation rate (Av) for arrays of
+    canopy elements.  See Farquhar_module_v_0_5_1.quad_Av_calc.
+    """
+    aa = -1.0/gc0
+    bb = Ca + (Vcmax - Rd)/gc0 + Kc*(1.0 + O2/Ko)
+    cc = Vcmax*(gammaStar - Ca) + Rd*(Ca + Kc*(1.0 + O2/Ko))
+    det = bb**2 - 4.0*aa*cc
+
+    return _masked_root(aa, bb, det)
+
+
+def quad_Aj_calc(gc0, Ca, gammaStar, J, Rd):
+    """
+    Calculate the RuBP regeneration-limited assimilation rate (Aj) for
+    arrays of canopy elements.  See Farquhar_module_v_0_5_1.quad_Aj_calc.
+    """
+    aa = -4.0 / gc0
+    bb = 4.0*Ca + 8.0*gammaStar + J/gc0 - 4.0*Rd/gc0
+    cc = J*(gammaStar - Ca) + Rd*(4.0*Ca + 8.0*gammaStar)
+    det = bb**2 - 4.0*aa*cc
+
+    return _masked_root(aa, bb, det)
+
+
+def J_calc(Ir, Jmax, phi_J, theta_J):
+    """
+    Calculate the electron transport rate (J) for arrays of canopy elements.
+    See Farquhar_module_v_0_5_1.J_calc.  The discriminant is never negative
+    for 0 < theta_J <= 1; it is clipped at zero for other values.
+    """
+    Ji = Ir * phi_J
+    aa = theta_J
+    bb = -Ji - Jmax
+    cc = Ji*Jmax
+    det = np.maximum(bb*bb - 4.0*aa*cc, 0.0)
+
+    return (-bb - np.sqrt(det))/(2.0*aa)
+
+
+def An_k_calc(Av_k, Aj_k, Rd):
+    """Calculate the net CO2 assimilation rate for arrays of canopy elements"""
+    return np.minimum(Av_k, Aj_k) - Rd
+
+
+def photosynthesis(gc0, Ir, Ca, Vcmax, Rd, Kc, Ko, O2, gammaStar, Jmax,
+                   phi_J, theta_J):
+    """
+    Calculate J, Av, Aj and An for whole time series of canopy elements.
+
+    All arguments broadcast against each other, so sun and shade elements
+    can be passed together as arrays of shape (2, n_timesteps) while
+    parameters such as O2 or phi_J stay scalars.
+
+    Args:
+        gc0: canopy element conductance to CO2 prior to photosynthetic
+             limitation
+        Ir: incoming photosynthetically active radiation (umol m^-2 s^-1)
+        Ca: atmospheric CO2 concentration
+        Vcmax: maximum carboxylation rate (umol m^-2 s^-1)
+        Rd: "dark" respiration that occurs in the light (umol m^-2 s^-1)
+        Kc: Michaelis-Menten constant for carboxylation (Pa)
+        Ko: Michaelis-Menten constant for oxygenation (Pa)
+        O2: oxygen concentration (Pa)
+        gammaStar: CO2 compensation point in the abscence of mitochondrial
+                   respiration (Pa)
+        Jmax: maximum electron transport rate (umol m^-2 s^-1)
+        phi_J: light adapted quantum yield (mol e- mol photons^-1)
+        theta_J: curvature of the photosynthetic response to light
+
+    Returns:
+        Structured array with the fields of PHOTOSYNTHESIS_DTYPE and the
+        broadcast shape of the inputs.
+    """
+    J = J_calc(Ir, Jmax, phi_J, theta_J)
+    Av = quad_Av_calc(gc0, Ca, Vcmax, Rd, Kc, Ko, O2, gammaStar)
+    Aj = quad_Aj_calc(gc0, Ca, gammaStar, J, Rd)
+
+    out = np.empty(np.broadcast(J, Av, Aj).shape,
+                   dtype=PHOTOSYNTHESIS_DTYPE)
+    out['J'] = J
+    out['Av'] = Av
+    out['Aj'] = Aj
+    out['An'] = An_k_calc(Av, Aj, Rd)
+
+    return out
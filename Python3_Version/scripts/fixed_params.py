@@ -13,4 +13,37 @@ jday = 160
 thyme = 5
 
 #TODO: Find out where these params come from
-h_fixed_para = None
\ No newline at end of file
+h_fixed_para = None
+
+# Canopy radiation parameters (see canopy_conductance.py)
+LAI_total = 3.2     # leaf area index
+Pcc = 1.0           # 'percent' canopy coverage (value must be 0-1)
+omega = 1.0         # canopy clumping factor (value must be 0-1)
+x_ratio = 1.0       # ratio of average projected areas of canopy elements on
+                    # horizontal and vertical surfaces (0 to infinity)
+alpha_PAR = 0.8     # leaf absorptivity in PAR
+alpha_NIR = 0.2     # leaf absorptivity in NIR
+
+# Farquhar parameters (see Farquhar_module_v_0_5_1.py)
+Kc_25 = 30.0        # Michaelis-Menten constant for carboxylation @ 25 C (Pa)
+Kc_q10 = 2.1        # Kc change per 10 C temperature increase
+Ko_25 = 30000.0     # Michaelis-Menten constant for oxygenation @ 25 C (Pa)
+Ko_q10 = 1.2        # Ko change per 10 C temperature increase
+Kr_25 = 60000.0     # RuBisCO activity @ 25 C (umol kg^-1 s^-1)
+Kr_q10 = 2.4        # Kr change per 10 C temperature increase
+NRf = 0.05          # proportion of leaf nitrogen in RuBisCO
+Nl = 0.0025         # leaf nitrogen concentration (kg N m^-2 leaf)
+Rd_mult = 0.015     # ratio of Rd to Vcmax
+Jvr = 2.1           # ratio of Jmax to Vcmax
+O2 = 21000.0        # oxygen concentration (Pa)
+phi_J = 0.3         # light adapted quantum yield (mol e- mol photons^-1)
+theta_J = 0.7       # curvature of the photosynthetic response to light
+gc_min = 1e-4       # smallest CO2 conductance, in the units of the Farquhar
+                    # quadratics (see coupled_conductance.solve_coupled)
+
+# Simulation pipeline parameters (see simulation.py)
+h_canopy = 15.0     # canopy height (m)
+gs_ref = 0.119      # Gs_ref (mol m^-2 s^-1), fit to PICO_atm_demand_data.csv
+u_ref_min = 0.1     # smallest wind speed used for Gva (m s^-1)
+d_min = 0.01        # smallest vapor pressure deficit used (kPa)
+missing = -999.0    # missing value code of the observed columns
@@ -0,0 +1,210 @@
+"""
+Created October 18, 2026
+
+Binary columnar cache of parsed input tables.
+
+Parsing the text forcing file and the CSVs in the data directory takes
+longer than a short simulation, and every job of a parameter sweep parses
+the same files again.  The first time a table is requested it is parsed as
+usual and written to a cache directory, as one .npy file per column plus a
+schema.json header naming the columns, their dtypes, the source the cache
+was built from and the options it was parsed with.  Later requests
+memory-map the columns with np.load(mmap_mode='r') instead of parsing, as
+long as the cache is newer than the source and was parsed the same way, so
+startup is near instant, nothing is copied until it is used, and parallel
+workers share the same pages through the OS page cache.
+
+The caches live in the user cache directory, $TREES_CACHE_DIR or
+$XDG_CACHE_HOME/trees (~/.cache/trees), one directory per source and set of
+parse options, so nothing is written into the source tree and reading the
+same file with other columns or dtypes does not overwrite the first cache.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from simulation import FORCING_COLUMNS, read_forcing
+
+# bump when the layout of the cache changes
+CACHE_VERSION = 2
+
+SCHEMA = 'schema.json'
+
+
+def cache_root():
+    """Directory holding the caches of all sources"""
+    root = os.environ.get('TREES_CACHE_DIR')
+    if not root:
+        root = os.path.join(os.environ.get('XDG_CACHE_HOME') or
+                            os.path.join(os.path.expanduser('~'), '.cache'),
+                            'trees')
+    return root
+
+
+def cache_path(source, options=None):
+    """
+    Default cache directory of a source file parsed with options, named
+    after the source and a hash of its absolute path and the options.
+    """
+    source = os.path.abspath(source)
+    key = json.dumps({'source': source, 'options': options}, sort_keys=True)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_root(), stem + '_' + digest)
+
+
+def is_valid(source, cache_dir, columns, options=None):
+    """
+    Check that the cache in cache_dir holds columns parsed with options and
+    was built from source after its last modification.
+    """
+    schema_path = os.path.join(cache_dir, SCHEMA)
+    if not os.path.exists(schema_path):
+        return False
+
+    try:
+        with open(schema_path) as f:
+            schema = json.load(f)
+    except ValueError:
+        return False
+
+    if (schema.get('version') != CACHE_VERSION or
+            [c['name'] for c in schema.get('columns', [])] != list(columns) or
+            schema.get('options') != options or
+            schema.get('source_size') != os.path.getsize(source)):
+        return False
+    if os.path.getmtime(schema_path) < os.path.getmtime(source):
+        return False
+
+    return all(os.path.exists(os.path.join(cache_dir, c['file']))
+               for c in schema['columns'])
+
+
+def write_cache(source, cache_dir, data, options=None):
+    """
+    Write the columns of a parsed table to cache_dir.
+
+    Args:
+        source: path of the file the table was parsed from
+        cache_dir: directory of the cache
+        data: dictionary of column name: 1-D numeric array
+        options: JSON serializable parse options the table was read with
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    pid = os.getpid()
+
+    # write to temporary files first so that concurrent jobs never see a
+    # half written column, and the schema last so it marks a finished cache
+    entries = []
+    for name, values in data.items():
+        values = np.ascontiguousarray(values)
+        entry = {'name': name, 'file': name + '.npy',
+                 'dtype': values.dtype.str, 'shape': list(values.shape)}
+        path = os.path.join(cache_dir, entry['file'])
+        tmp_path = path + ".tmp.{:d}.npy".format(pid)
+        np.save(tmp_path, values)
+        os.replace(tmp_path, path)
+        entries.append(entry)
+
+    schema = {'version': CACHE_VERSION,
+              'source': os.path.basename(source),
+              'source_size': os.path.getsize(source),
+              'source_mtime': os.path.getmtime(source),
+              'options': options,
+              'n_rows': int(len(next(iter(data.values())))) if data else 0,
+              'columns': entries}
+
+    schema_path = os.path.join(cache_dir, SCHEMA)
+    tmp_schema = schema_path + ".tmp.{:d}".format(pid)
+    with open(tmp_schema, 'w') as f:
+        json.dump(schema, f, indent=1)
+    os.replace(tmp_schema, schema_path)
+
+
+def read_cache(cache_dir):
+    """
+    Memory-map every column of a cache.
+
+    Returns:
+        Dictionary of column name: read-only numpy memmap.
+    """
+    with open(os.path.join(cache_dir, SCHEMA)) as f:
+        schema = json.load(f)
+    return {c['name']: np.load(os.path.join(cache_dir, c['file']),
+                               mmap_mode='r')
+            for c in schema['columns']}
+
+
+def cached_columns(source, reader, columns, options=None, cache_dir=None):
+    """
+    Columns of a table, parsed by reader only when the cache is missing,
+    older than source or parsed with other options.
+
+    Args:
+        source: path of the text file
+        reader: function taking source and returning a dictionary of
+                columns
+        columns: names of the columns reader returns, in order
+        options: JSON serializable description of everything besides columns
+                 that changes what reader returns, e.g. its dtype
+        cache_dir: directory of the cache, see cache_path by default
+
+    Returns:
+        Dictionary of column name: read-only numpy memmap.
+    """
+    columns = list(columns)
+    if cache_dir is None:
+        cache_dir = cache_path(source, dict(options or {}, columns=columns))
+
+    if not is_valid(source, cache_dir, columns, options):
+        write_cache(source, cache_dir, reader(source), options)
+
+    return read_cache(cache_dir)
+
+
+def load_forcing(path, columns=FORCING_COLUMNS, cache_dir=None):
+    """
+    Forcing columns as read_forcing returns them, from the cache when it is
+    up to date.
+    """
+    return cached_columns(path, lambda p: read_forcing(p, columns), columns,
+                          {'reader': 'read_forcing'}, cache_dir)
+
+
+def load_csv(path, columns, usecols=None, dtype='float64', cache_dir=None):
+    """
+    Numeric columns of a comma separated file with one header line, e.g.
+    load_csv('PICO_ws_obs_data.csv', ('Mpa', 'PLC')), from the cache when it
+    is up to date.
+
+    Fields may be quoted, as R's write.csv quotes the header and row names.
+    Quoted text that is not a number, e.g. dates, cannot be cached; leave
+    those columns out with usecols.
+
+    Raises:
+        ValueError: for fields that are not numbers, or when the number of
+                    columns read does not match columns.
+    """
+    if usecols is not None:
+        usecols = [int(i) for i in np.atleast_1d(usecols)]
+    options = {'reader': 'load_csv', 'usecols': usecols,
+               'dtype': np.dtype(dtype).str}
+
+    def reader(p):
+        try:
+            data = np.loadtxt(p, delimiter=',', skiprows=1, usecols=usecols,
+                              dtype=dtype, quotechar='"', ndmin=2)
+        except ValueError as e:
+            raise ValueError("{} has fields that are not numbers, select "
+                             "the numeric columns with usecols: {}"
+                             .format(p, e))
+        if data.shape[1] != len(columns):
+            raise ValueError("{} has {:d} columns, but {:d} names were given"
+                             .format(p, data.shape[1], len(columns)))
+        return {name: np.ascontiguousarray(data[:, i])
+                for i, name in enumerate(columns)}
+
+    return cached_columns(path, reader, columns, options, cache_dir)
@@ -0,0 +1,201 @@
+"""
+Created October 18, 2026
+
+Closed-form and streaming estimates of the Gs_ref parameter.
+
+gs_ref_module.gsRef fits gs = ref - 0.6 * ref * log(D) with curve_fit.  The
+model is linear in ref, gs = ref * x with x = 1 - 0.6 * log(D), so the least
+squares estimate is
+
+    ref = sum(x * gs) / sum(x * x)
+
+and depends on the data only through the sums n, sum(x^2), sum(x gs),
+sum(gs^2) and sum(gs).  GsRefEstimator keeps these sums, so Gs_ref can be
+updated as new sap flux / VPD records arrive without re-reading the history,
+for many trees at once and optionally over a rolling window of the most
+recent records.  The variance of ref matches the covariance returned by
+curve_fit.
+"""
+
+import numpy as np
+
+# order of the sufficient statistics along the first axis of
+# GsRefEstimator.stats
+STATS = ('n', 'sxx', 'sxy', 'syy', 'sy')
+
+
+def calc_x(d):
+    """Regressor of the Gs_ref model, 1 - 0.6 * log(D)"""
+    return 1 - 0.6 * np.log(d)
+
+
+def _terms(d_obs, gs_obs):
+    """
+    Contribution of every record to the sufficient statistics.  Records
+    with missing values or D <= 0 contribute nothing.
+    """
+    d_obs = np.asarray(d_obs, dtype='float64')
+    gs_obs = np.asarray(gs_obs, dtype='float64')
+
+    valid = np.isfinite(d_obs) & np.isfinite(gs_obs) & (d_obs > 0)
+    x = np.where(valid, calc_x(np.where(valid, d_obs, 1.0)), 0.0)
+    y = np.where(valid, gs_obs, 0.0)
+
+    return np.stack(np.broadcast_arrays(valid.astype('float64'),
+                                        x * x, x * y, y * y, y))
+
+
+def _estimates(stats):
+    """Gs_ref, its variance and r-squared from the sufficient statistics"""
+    n, sxx, sxy, syy, sy = stats
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gs_ref = sxy / sxx
+
+        # residual sum of squares at the least squares estimate
+        sse = np.maximum(syy - gs_ref * sxy, 0.0)
+        variance = sse / (n - 1) / sxx
+        r_sqr = 1 - sse / (syy - sy * sy / n)
+
+    return gs_ref, variance, r_sqr
+
+
+def fit_gs_ref(d_obs, gs_obs):
+    """
+    Closed-form least squares fit of Gs_ref along the last axis.
+
+    Args:
+        d_obs: atmospheric vapor pressure deficit (kPa), array
+        gs_obs: non-water-stressed, non-photosynthesis-limited canopy
+                conductance (mol m^-2 s^-1), array
+
+    Returns:
+        gs_ref, the variance of gs_ref and r-squared, with the shape of the
+        inputs without the last axis, e.g. one value per tree for inputs of
+        shape (n_trees, n_records).
+    """
+    return _estimates(_terms(d_obs, gs_obs).sum(axis=-1))
+
+
+def rolling_gs_ref(d_obs, gs_obs, window):
+    """
+    Gs_ref over a rolling window of records along the last axis.
+
+    Returns:
+        gs_ref, its variance and r-squared for the window ending at every
+        record, NaN until window records have been seen.
+    """
+    terms = _terms(d_obs, gs_obs)
+    csum = np.cumsum(terms, axis=-1)
+
+    stats = np.full(csum.shape, np.nan)
+    if window <= csum.shape[-1]:
+        stats[..., window - 1] = csum[..., window - 1]
+        stats[..., window:] = csum[..., window:] - csum[..., :-window]
+
+    return _estimates(stats)
+
+
+class GsRefEstimator(object):
+    """
+    Streaming estimate of Gs_ref from running sufficient statistics.
+
+    Args:
+        shape(tuple):
+            Shape of the estimates, e.g. (n_trees,).  Records passed to
+            update have this shape plus a trailing record axis.
+
+        window(int):
+            Number of most recent records to use.  None uses every record
+            seen.
+
+    Attributes:
+        stats(numpy array):
+            The sums named in STATS, stacked along the first axis.
+
+    Examples:
+        est = GsRefEstimator((n_trees,), window=2000)
+        est.update(d_new, gs_new)       # arrays of shape (n_trees, n_new)
+        gs_ref = est.gs_ref
+    """
+
+    def __init__(self, shape=(), window=None):
+        self.shape = tuple(shape)
+        self.window = window
+        self.stats = np.zeros((len(STATS),) + self.shape)
+
+        if window is not None:
+            # the terms of the records in the window, kept so they can be
+            # removed again when they leave it
+            self.buffer = np.zeros((len(STATS),) + self.shape + (window,))
+            self.pos = 0
+            self.evicted = 0
+
+    def update(self, d_obs, gs_obs):
+        """
+        Add records.
+
+        Args:
+            d_obs, gs_obs: arrays of shape self.shape + (n_new,); a 1-D
+                           array is taken as n_new records of one tree
+        """
+        terms = _terms(d_obs, gs_obs)
+        terms = np.broadcast_to(terms, (len(STATS),) + self.shape +
+                                terms.shape[-1:])
+
+        if self.window is None:
+            self.stats += terms.sum(axis=-1)
+            return self
+
+        # only the last window records can end up in the window
+        terms = terms[..., -self.window:]
+        k = terms.shape[-1]
+        idx = (self.pos + np.arange(k)) % self.window
+
+        self.stats -= self.buffer[..., idx].sum(axis=-1)
+        self.stats += terms.sum(axis=-1)
+        self.buffer[..., idx] = terms
+        self.pos = (self.pos + k) % self.window
+
+        # recompute the sums once a window's worth of records has been
+        # removed, so round-off from the subtractions cannot build up
+        self.evicted += k
+        if self.evicted >= self.window:
+            self.stats = self.buffer.sum(axis=-1)
+            self.evicted = 0
+
+        return self
+
+    def merge(self, other):
+        """Add the records of another estimator without a window"""
+        if self.window is not None or other.window is not None:
+            raise ValueError("Only estimators without a window can be merged")
+        self.stats = self.stats + other.stats
+        return self
+
+    @property
+    def n(self):
+        """Number of records used"""
+        return self.stats[0]
+
+    @property
+    def gs_ref(self):
+        """Least squares estimate of Gs_ref"""
+        return _estimates(self.stats)[0]
+
+    @property
+    def variance(self):
+        """Variance of the Gs_ref estimate"""
+        return _estimates(self.stats)[1]
+
+    @property
+    def r_sqr(self):
+        """R-squared of the fit"""
+        return _estimates(self.stats)[2]
+
+    def simulate(self, d):
+        """
+        Gs in the absence of water supply or photosynthetic limitation for
+        D of shape self.shape + (n,)
+        """
+        return np.asarray(self.gs_ref)[..., None] * calc_x(d)
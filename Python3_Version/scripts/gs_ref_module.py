@@ -20,13 +20,15 @@ from statsmodels.api import OLS
 from scipy.optimize import curve_fit
 from numpy import loadtxt, column_stack, ones_like, log
 
+from batch_fit import gs_ref_jac
+
 
 def fit_func(x, ref):
     """Function for curve fit optimization"""
     return ref - (0.6 * ref) * log(x)
 
 
-def gsRef(work_dir, csv_atm):
+def gsRef(work_dir, csv_atm, return_covar=False):
     """
     A module to calculate the Gsref coefficient.
 
@@ -42,6 +44,10 @@ def gsRef(work_dir, csv_atm):
             non-water-stressed non-photosynthesis-limited canopy
             conductance (Gs) calculated from sap flux measurements.
 
+        return_covar(bool):
+            Also return the variance of gs_ref from the fit, e.g. for
+            uncertainty.parametric_samples.
+
     """
 
     # set the current working directory -make sure to change this as needed
@@ -81,7 +87,8 @@ def gsRef(work_dir, csv_atm):
     gs_paras, gs_covar = curve_fit(fit_func,
                                    d_obs,
                                    gs_obs,
-                                   p0=start)
+                                   p0=start,
+                                   jac=gs_ref_jac)
 
     # extract gs_ref from the list
     gs_ref = gs_paras[0]
@@ -97,4 +104,6 @@ def gsRef(work_dir, csv_atm):
     # summary = OLS(gs_sim, obs_stacked).fit()
     # r_sqr = summary.rsquared
 
+    if return_covar:
+        return gs_ref, gs_covar
     return gs_ref
\ No newline at end of file
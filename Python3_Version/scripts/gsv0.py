@@ -9,7 +9,21 @@
 import sys
 import traceback
 
-from numpy import log
+from numpy import asarray, expand_dims, log
+
+from time_alignment import hold, repeat_to, timestamps_from_dates
+
+
+def calc_gsv0(ws_sim, gs_ref, d, xs=1.0):
+    """
+    Gsv0 = xs * (ws * Gsref - (m * ln(d))), where m = Gsref * 0.6.
+
+    ws_sim, d and xs hold one value per time step along the last axis.
+    Leading axes of ws_sim and gs_ref, e.g. an ensemble of parameter samples
+    from uncertainty.py, give one gsv0 series each.
+    """
+    gs_ref = expand_dims(asarray(gs_ref, dtype='float64'), -1)
+    return asarray(xs) * (asarray(ws_sim) * gs_ref - (0.6 * gs_ref) * log(d))
 
 
 class Gsv_0(object):
@@ -53,6 +67,10 @@ class Gsv_0(object):
             Variable to store the observed vapor pressure deficit extracted 
             from the csv file in gs_ref_module.
 
+        d_times(array):
+            Timestamps of d_obs, from the d_times attribute of gs if it has
+            one, e.g. time_alignment.timestamps_from_jday of the forcing.
+
         r_sqrs(dictionary):
             Variable to store the r-squared values for each calculation (if
             they were calculated).
@@ -69,10 +87,6 @@ class Gsv_0(object):
 
                 self.r_sqrs['ws']
 
-        TO DO:
-            Include Xylem Scalar in final calculation.  Sizes do not match, so 
-            maybe look into doing the same as other array?
-
     """
 
     def __init__(self,
@@ -89,6 +103,7 @@ class Gsv_0(object):
         # unpack and store variables from each calculation's object
         self.xs['obs'] = xs.obs
         self.xs['sim'] = xs.sim
+        self.xs['dates'] = getattr(xs, 'dates', None)
         self.ws['obs'] = ws.obs
         self.ws['sim'] = ws.sim
         self.r_sqrs['ws'] = ws.r_sqr
@@ -96,58 +111,52 @@ class Gsv_0(object):
         self.gs['sim'] = gs.gs_sim
         self.gs['ref'] = gs.gs_ref
         self.d_obs = gs.d_obs
+        self.d_times = getattr(gs, 'd_times', None)
         self.r_sqrs['gs'] = gs.r_sqr
 
-    def calculate(self):
+    def calculate(self, times=None):
         """Calculates gsv0.
 
         Calculates gsv0 using the formula:
-            Gsv0 = ws * Gsref - (m * ln(d_obs)),
+            Gsv0 = xs * (ws * Gsref - (m * ln(d_obs))),
             where m = Gsref * 0.6
 
+        When times are given, d_obs is matched to the ws time steps by
+        timestamp if it has d_times, every step taking the last d_obs record
+        at or before it, and the daily xylem scalar is held over the time
+        steps of its day.  Without timestamps both are stretched to the
+        length of ws by repeating every value, and a series that already
+        has one value per time step is used as it is.  ws and xs may carry
+        a leading ensemble axis, with one Gs_ref per member, as
+        uncertainty.py passes them.
+
+        Args:
+            times(numpy array):
+                Timestamps of the ws time steps, see
+                time_alignment.timestamps_from_jday.
+
         It directly modifies the gsv0 attribute of this class.
 
         """
         try:
-            # calculate m scalar
-            m = self.gs['ref'] * 0.6
-
             # initialize local variables
-            ws_sim = self.ws['sim']
-            d_obs = self.d_obs
-            xs_sim = self.xs['sim']
+            ws_sim = asarray(self.ws['sim'])
             gs_ref = self.gs['ref']
-
-            # initialize the length variables and calculate time step
-            # difference
-            ws_sim_len = len(ws_sim)
-            d_obs_len = len(d_obs)
-            time_steps = int(ws_sim_len / d_obs_len)
-            rem = ws_sim_len % d_obs_len
-            goal_len = (ws_sim_len - rem)
-
-            # initialize new array for storage of time step adjustment
-            d_extend = []
-            d_ext_len = len(d_extend)
-
-            # initialize control variable
-            i = 0
-
-            # duplicate d_obs readings to match size of gs_ref
-            while d_ext_len < goal_len:
-                for j in range(time_steps):
-                    d_extend.append(d_obs[i])
-                i += 1
-                d_ext_len = len(d_extend)
-
-            # if the time steps don't divide evenly, tack on values at the
-            # end to make it the correct size
-            while rem > 0:
-                d_extend.append(d_obs[i - 1])
-                rem -= 1
+            n = ws_sim.shape[-1]
+
+            # match d_obs and the xylem scalar to the ws time steps
+            if times is not None and self.d_times is not None:
+                d_extend = hold(self.d_times, self.d_obs, times)
+            else:
+                d_extend = repeat_to(self.d_obs, n)
+            if times is not None and self.xs['dates'] is not None:
+                xs_times = timestamps_from_dates(self.xs['dates'])
+                xs_extend = hold(xs_times, self.xs['sim'], times)
+            else:
+                xs_extend = repeat_to(self.xs['sim'], n)
 
             # calculate gsv_0
-            self.gsv_0 = ws_sim * gs_ref - (m * log(d_extend))
+            self.gsv_0 = calc_gsv0(ws_sim, gs_ref, d_extend, xs_extend)
 
             # Debug
             # print(self.gsv_0)
@@ -157,9 +166,11 @@ class Gsv_0(object):
                     Check that these following sizes match.  If they don't
                     match, your time steps may be the problem.
                     """)
-            print("Xylem Scalar:          ", len(xs_sim))
-            print("Water Stress:          ", ws_sim_len)
-            print("D observed (extended): ", d_ext_len)
+            print("Xylem Scalar:          ", len(self.xs['sim']))
+            print("Water Stress:          ", len(self.ws['sim']))
+            print("VPD:                   ", len(self.d_obs))
+            print("Time stamps:           ",
+                  None if times is None else len(times))
             print(v)
 
         except Exception as e:
@@ -0,0 +1,155 @@
+"""
+Created October 18, 2026
+
+Tabulated soil water potential and unsaturated hydraulic conductivity.
+
+psi(theta) and ku(theta) of the van Genuchten / Mualem model need several
+fractional powers per evaluation, which add up when a soil water solver
+calls them for every layer and half-hour.  Both are monotone functions of
+the effective saturation S alone, so HydraulicTable tabulates them once per
+soil texture and answers queries by linear interpolation, which keeps them
+monotone.
+
+The grid is uniform in S, so a lookup needs no search.  The interpolation
+error is measured at the midpoint of every interval when the table is
+built, and intervals where it exceeds the tolerance are evaluated exactly
+instead.  These are few: the intervals holding the kinks of psi and those
+next to saturation, where the relative conductivity behaves like
+1 - 2 ((1 - S) / m)^m, which no linear table in S can follow for small m.
+"""
+
+import numpy as np
+
+from soil_water_potential import (effective_saturation,
+                                  relative_conductivity,
+                                  soil_water_potential_array)
+
+# in-memory cache of tables, keyed by texture and table options
+_tables = {}
+
+
+class HydraulicTable(object):
+    """
+    Lookup table of psi_soil and ku for one soil texture.
+
+    Args:
+        texture(SoilTexture):
+            Hydraulic parameters, see soil_texture.soil_texture.
+
+        n_points(int):
+            Number of points of the uniform grid in S.
+
+        tol_psi(float):
+            Largest acceptable absolute error of psi_soil (MPa).
+
+        tol_ku(float):
+            Largest acceptable absolute error of ku as a fraction of ks.
+
+    Attributes:
+        S(numpy array):
+            Grid of effective saturation.
+
+        psi, kr(numpy array):
+            psi_soil (MPa) and relative conductivity ku / ks on the grid.
+
+        exact(numpy array):
+            True for the intervals that are evaluated exactly.
+
+        max_error(dictionary):
+            Largest error of 'psi' (MPa) and 'ku' (fraction of ks) found at
+            the midpoints of the interpolated intervals, which is below the
+            tolerances.
+
+    Examples:
+        table = get_hydraulic_table(soil_texture(0.5, 25, 25))
+        psi_soil = table.psi_soil(theta)
+        ku = table.ku(theta)
+    """
+
+    def __init__(self,
+                 texture,
+                 n_points=4097,
+                 tol_psi=1e-4,
+                 tol_ku=1e-4):
+
+        self.texture = texture
+        self.tol = {'psi': tol_psi, 'ku': tol_ku}
+
+        bubbling_pressure, pore_size_index, residual = texture.van_genuchten
+        n = pore_size_index + 1
+        m = pore_size_index / n
+
+        self.n = int(n_points)
+        self.S = np.linspace(0.0, 1.0, self.n)
+        self.psi = self.__psi_exact(self.S)
+        self.kr = relative_conductivity(self.S, pore_size_index)
+
+        # store slopes too, so a lookup is two np.take calls per field
+        self.slopes = {'psi': np.diff(self.psi), 'ku': np.diff(self.kr)}
+
+        mid = 0.5 * (self.S[1:] + self.S[:-1])
+        errors = {'psi': np.abs(0.5 * (self.psi[1:] + self.psi[:-1]) -
+                                self.__psi_exact(mid)),
+                  'ku': np.abs(0.5 * (self.kr[1:] + self.kr[:-1]) -
+                               relative_conductivity(mid, pore_size_index))}
+        exact = (errors['psi'] > tol_psi) | (errors['ku'] > tol_ku)
+
+        # the S >= 0.001 clip and the -10 MPa floor put kinks into psi,
+        # which the midpoint error can miss
+        S_floor = (1 + (10 / (0.0001019977334 * bubbling_pressure)) ** n)
+        S_floor = S_floor ** -m
+        for kink in (0.001, S_floor):
+            exact[min(int(kink * (self.n - 1)), self.n - 2)] = True
+
+        self.exact = exact
+        self.max_error = {name: float(np.max(err[~exact], initial=0.0))
+                          for name, err in errors.items()}
+
+    def __psi_exact(self, S):
+        texture = self.texture
+        theta = texture.residual + S * (texture.porosity - texture.residual)
+        return soil_water_potential_array(theta, texture.porosity,
+                                          *texture.van_genuchten)
+
+    def __kr_exact(self, S):
+        return relative_conductivity(S, self.texture.pore_size_index)
+
+    def __lookup(self, theta, values, slopes, exact):
+        texture = self.texture
+        S = effective_saturation(theta, texture.porosity, texture.residual)
+        S = np.clip(S, 0.0, 1.0)
+
+        pos = S * (self.n - 1)
+        idx = np.minimum(pos.astype('int64'), self.n - 2)
+
+        out = np.take(values, idx)
+        out += (pos - idx) * np.take(slopes, idx)
+
+        in_exact = np.take(self.exact, idx)
+        if np.any(in_exact):
+            out = np.asarray(out)
+            out[in_exact] = exact(S[in_exact])
+
+        return out
+
+    def psi_soil(self, theta):
+        """Soil water potential (MPa) for an array of theta"""
+        return self.__lookup(theta, self.psi, self.slopes['psi'],
+                             self.__psi_exact)
+
+    def ku(self, theta):
+        """Unsaturated hydraulic conductivity, in the units of ks"""
+        kr = self.__lookup(theta, self.kr, self.slopes['ku'],
+                           self.__kr_exact)
+        return self.texture.ks * kr
+
+
+def get_hydraulic_table(texture, **kwargs):
+    """
+    Return a HydraulicTable for texture, building it only once per process.
+    Keyword arguments are passed on to HydraulicTable.
+    """
+    key = (texture.key, tuple(sorted(kwargs.items())))
+    if key not in _tables:
+        _tables[key] = HydraulicTable(texture, **kwargs)
+    return _tables[key]
@@ -0,0 +1,280 @@
+"""
+Created October 18, 2026
+
+Compiled kernels for the per-time-step physics.
+
+canopy_step runs aerodynamic conductance (aerodynamic_conductance_module_v_1),
+two big leaf canopy radiation (canopy_conductance), Gc0_k (Gc0_k_module) and
+Farquhar photosynthesis (Farquhar_module_v_0_5_1) for every time step of the
+forcing arrays.  Two backends compute the same thing:
+
+    'numba'  one fused loop over the time steps, compiled with numba
+    'numpy'  the array stages in aerodynamic_array, canopy_radiation and
+             farquhar_array
+
+The numba backend is used when numba is installed, otherwise the code falls
+back to numpy.
+"""
+
+from math import exp, log, sqrt, tan
+
+import numpy as np
+
+import fixed_params
+from canopy_radiation import two_big_leaf, max_z_angle, Kd_calc
+from Gc0_k_module import calc_Gc0_k
+from aerodynamic_array import calc_Gva
+import farquhar_array as fa
+from tau_d_table import get_tau_d_table
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ('numpy', 'numba')
+
+# fields of the structured array returned by canopy_step
+KERNEL_DTYPE = np.dtype([('Gva', 'float64'),
+                         ('LAI_sun', 'float64'),
+                         ('LAI_shd', 'float64'),
+                         ('Q_sun', 'float64'),
+                         ('Q_shd', 'float64'),
+                         ('PAR_Ps_sun', 'float64'),
+                         ('PAR_Ps_shd', 'float64'),
+                         ('Gc0_sun', 'float64'),
+                         ('Gc0_shd', 'float64'),
+                         ('An_sun', 'float64'),
+                         ('An_shd', 'float64')])
+
+# factor to convert units from umol m^-2 s^-1 to W m^-2 (radiation module)
+con_units = 0.235
+
+
+def default_backend():
+    """Return 'numba' if numba is installed, 'numpy' otherwise"""
+    return 'numpy' if numba is None else 'numba'
+
+
+def _jit(func):
+    """Compile func with numba when it is available"""
+    if numba is None:
+        return func
+    return numba.njit(cache=True, error_model='numpy')(func)
+
+
+# ----------------------------------------------------------------------------
+# scalar physics used by the fused loop
+# ----------------------------------------------------------------------------
+
+@_jit
+def _Gva(z, h, u_ref, P_ref, T_ref):
+    """aerodynamic_conductance_module_v_1.calc_Gva under neutral stability"""
+    rho_air = 44.6 * P_ref * 273.15 / (101.3 * (273.15 + T_ref))
+    d = 0.65 * h
+    zm = 0.1 * h
+    zh = 0.2 * zm
+    k = 0.4
+    return k ** 2 * rho_air * u_ref / (log((z - d) / zm) * log((z - d) / zh))
+
+
+@_jit
+def _quad_root(aa, bb, cc):
+    det = bb**2 - 4.0*aa*cc
+    if det < 0.0:
+        return 0.0
+    return (-bb + sqrt(det)) / (2.0*aa)
+
+
+@_jit
+def _An(gc0, Ir, Ca, Vcmax, Rd, Kc, Ko, O2, gammaStar, Jmax, phi_J, theta_J):
+    """Net assimilation, see Farquhar_module_v_0_5_1"""
+    Ji = Ir * phi_J
+    bb = -Ji - Jmax
+    det = bb*bb - 4.0*theta_J*Ji*Jmax
+    if det < 0.0:
+        det = 0.0
+    J = (-bb - sqrt(det))/(2.0*theta_J)
+
+    Av = _quad_root(-1.0/gc0,
+                    Ca + (Vcmax - Rd)/gc0 + Kc*(1.0 + O2/Ko),
+                    Vcmax*(gammaStar - Ca) + Rd*(Ca + Kc*(1.0 + O2/Ko)))
+    Aj = _quad_root(-4.0 / gc0,
+                    4.0*Ca + 8.0*gammaStar + J/gc0 - 4.0*Rd/gc0,
+                    J*(gammaStar - Ca) + Rd*(4.0*Ca + 8.0*gammaStar))
+    return min(Av, Aj) - Rd
+
+
+@_jit
+def _canopy_loop(z_angle, Iob, Iod, QobNIR, QodNIR, u_ref, t_ref, p_atm,
+                 Gsv0, Ca, Vcmax, Rd, Kc, Ko, gammaStar, Jmax,
+                 z, h, LAI_total, Pcc, omega, x_ratio, alpha_PAR, alpha_NIR,
+                 Kd, O2, phi_J, theta_J, max_z, out):
+    n = z_angle.shape[0]
+
+    x_term = x_ratio + 1.774 * (x_ratio + 1.182) ** -0.733
+    sqrt_PAR = sqrt(alpha_PAR)
+    sqrt_NIR = sqrt(alpha_NIR)
+    d_PAR = (1 - exp(-sqrt_PAR * Kd * LAI_total)) / (sqrt_PAR * Kd * LAI_total)
+    d_NIR = (1 - exp(-sqrt_NIR * Kd * LAI_total)) / (sqrt_NIR * Kd * LAI_total)
+
+    for i in range(n):
+        Gva = _Gva(z, h, u_ref[i], p_atm[i], t_ref[i])
+
+        # canopy radiation
+        tz = tan(min(z_angle[i], max_z))
+        Kbe = omega * sqrt(x_ratio ** 2 + tz ** 2) / x_term
+        exp_be = exp(-Kbe * LAI_total)
+        if Pcc == 1.0:
+            LAI_sun = (1 - exp_be) / Kbe
+        else:
+            LAI_sun = (1 - exp(-Kbe * (LAI_total / Pcc))) / Kbe
+        LAI_shd = LAI_total - LAI_sun
+
+        Id = Iod[i] * d_PAR
+        Qd_NIR = QodNIR[i] * d_NIR
+        Isc = 0.5 * Iob[i] * (exp(-sqrt_PAR * Kbe * LAI_total) - exp_be)
+        Qsc_NIR = 0.5 * QobNIR[i] * (exp(-sqrt_NIR * Kbe * LAI_total) - exp_be)
+
+        PAR_shd = alpha_PAR * (Id + Isc)
+        PAR_sun = PAR_shd + alpha_PAR * Kbe * Iob[i]
+        NIR_shd = alpha_NIR * (Qd_NIR + Qsc_NIR)
+
+        # conductance prior to photosynthetic limitation, converted from
+        # mol m^-2 s^-1 to umol m^-2 s^-1 Pa^-1 for the Farquhar quadratics
+        Gc0_sun = 1 / (1 / (Gsv0[i] * LAI_sun) + 1 / Gva) / LAI_sun / 1.6
+        Gc0_shd = 1 / (1 / (Gsv0[i] * LAI_shd) + 1 / Gva) / LAI_shd / 1.6
+        to_photo = 1e3 / p_atm[i]
+
+        out[i, 0] = Gva
+        out[i, 1] = LAI_sun
+        out[i, 2] = LAI_shd
+        out[i, 3] = PAR_sun + NIR_shd + alpha_NIR * Kbe * QobNIR[i]
+        out[i, 4] = PAR_shd + NIR_shd
+        out[i, 5] = PAR_sun
+        out[i, 6] = PAR_shd
+        out[i, 7] = Gc0_sun
+        out[i, 8] = Gc0_shd
+        out[i, 9] = _An(Gc0_sun * to_photo, PAR_sun / con_units, Ca[i],
+                        Vcmax[i], Rd[i], Kc[i], Ko[i], O2, gammaStar[i],
+                        Jmax[i], phi_J, theta_J)
+        out[i, 10] = _An(Gc0_shd * to_photo, PAR_shd / con_units, Ca[i],
+                         Vcmax[i], Rd[i], Kc[i], Ko[i], O2, gammaStar[i],
+                         Jmax[i], phi_J, theta_J)
+
+
+# ----------------------------------------------------------------------------
+# numpy backend
+# ----------------------------------------------------------------------------
+
+def _canopy_numpy(z_angle, rad, u_ref, t_ref, p_atm, Gsv0, Ca, Vcmax, Rd,
+                  Kc, Ko, gammaStar, Jmax, z, h, LAI_total, Pcc, omega,
+                  x_ratio, alpha_PAR, alpha_NIR, tau_d, O2, phi_J, theta_J,
+                  out):
+    out['Gva'] = Gva = calc_Gva(z, h, u_ref, p_atm, t_ref)
+
+    canopy = two_big_leaf(z_angle, rad, LAI_total, Pcc, omega, x_ratio,
+                          alpha_PAR, alpha_NIR, tau_d)
+    for name in ('LAI_sun', 'LAI_shd', 'Q_sun', 'Q_shd',
+                 'PAR_Ps_sun', 'PAR_Ps_shd'):
+        out[name] = canopy[name]
+
+    L = np.stack([canopy['LAI_sun'], canopy['LAI_shd']])
+    Gc0 = calc_Gc0_k(Gsv0, Gva, L)
+    out['Gc0_sun'], out['Gc0_shd'] = Gc0
+
+    Ir = np.stack([canopy['PAR_Ps_sun'], canopy['PAR_Ps_shd']]) / con_units
+    An = fa.photosynthesis(Gc0 * (1e3 / p_atm), Ir, Ca, Vcmax, Rd, Kc, Ko,
+                           O2, gammaStar, Jmax, phi_J, theta_J)['An']
+    out['An_sun'], out['An_shd'] = An
+
+
+def canopy_step(z_angle,
+                rad,
+                u_ref,
+                t_ref,
+                p_atm,
+                Gsv0,
+                Ca,
+                Vcmax,
+                Rd,
+                Kc,
+                Ko,
+                gammaStar,
+                Jmax,
+                z=30.0,
+                h=15.0,
+                LAI_total=fixed_params.LAI_total,
+                Pcc=fixed_params.Pcc,
+                omega=fixed_params.omega,
+                x_ratio=fixed_params.x_ratio,
+                alpha_PAR=fixed_params.alpha_PAR,
+                alpha_NIR=fixed_params.alpha_NIR,
+                tau_d=None,
+                O2=21000.0,
+                phi_J=0.3,
+                theta_J=0.7,
+                backend=None):
+    """
+    Run the per-time-step canopy physics for whole forcing arrays.
+
+    Args:
+        z_angle: zenith angle (radians), see solar_geometry
+        rad: partitioned above canopy radiation, see radiation_partition
+        u_ref: wind speed @ reference height (m s-1)
+        t_ref: air temperature @ reference height (Celcius)
+        p_atm: atomspheric pressure @ reference height (kPa)
+        Gsv0: stomatal conductance to water vapour prior to photosynthetic
+              limitation (mol m^-2 s^-1)
+        Ca: atmospheric CO2 partial pressure (Pa)
+        Vcmax, Rd, Kc, Ko, gammaStar, Jmax: Farquhar parameters at leaf
+              temperature, see Farquhar_module_v_0_5_1
+        z: height of instruments on tower (reference height) (m)
+        h: canopy height (m)
+        LAI_total, Pcc, omega, x_ratio, alpha_PAR, alpha_NIR: canopy
+              parameters, see canopy_radiation.two_big_leaf
+        tau_d: diffuse transmissivity, looked up if not given
+        O2, phi_J, theta_J: Farquhar parameters
+        backend: 'numba', 'numpy' or None for default_backend()
+
+    Returns:
+        Structured array with the fields of KERNEL_DTYPE.  Conductances are
+        in mol m^-2 s^-1 and An in umol m^-2 s^-1.
+    """
+    if backend is None:
+        backend = default_backend()
+    if backend not in BACKENDS:
+        raise ValueError("Unknown backend: " + str(backend))
+    if backend == 'numba' and numba is None:
+        raise ValueError("The numba backend needs numba to be installed.")
+
+    if tau_d is None:
+        tau_d = float(get_tau_d_table()(LAI_total, omega, x_ratio))
+
+    z_angle = np.asarray(z_angle, dtype='float64')
+    n = z_angle.shape[0]
+    out = np.empty(n, dtype=KERNEL_DTYPE)
+
+    if backend == 'numpy':
+        _canopy_numpy(z_angle, rad, u_ref, t_ref, p_atm, Gsv0, Ca, Vcmax,
+                      Rd, Kc, Ko, gammaStar, Jmax, z, h, LAI_total, Pcc,
+                      omega, x_ratio, alpha_PAR, alpha_NIR, tau_d, O2,
+                      phi_J, theta_J, out)
+        return out
+
+    def column(a):
+        return np.broadcast_to(np.asarray(a, dtype='float64'), (n,))
+
+    _canopy_loop(z_angle,
+                 column(rad['Iob']), column(rad['Iod']),
+                 column(rad['QobNIR']), column(rad['QodNIR']),
+                 column(u_ref), column(t_ref), column(p_atm),
+                 column(Gsv0), column(Ca), column(Vcmax), column(Rd),
+                 column(Kc), column(Ko), column(gammaStar), column(Jmax),
+                 float(z), float(h), float(LAI_total), float(Pcc),
+                 float(omega), float(x_ratio), float(alpha_PAR),
+                 float(alpha_NIR), float(Kd_calc(tau_d, LAI_total)),
+                 float(O2), float(phi_J), float(theta_J), float(max_z_angle),
+                 out.view('float64').reshape(n, len(KERNEL_DTYPE.names)))
+    return out
+
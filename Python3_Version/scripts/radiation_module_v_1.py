@@ -6,7 +6,7 @@ mattheworion.cook@gmail.com
 """
 
 from math import cos, sin, pi, asin, acos
-from fixed_params import lati, longi, time
+from fixed_params import lati, longi
 
 
 #  ***  In the original TREES C++ code (in util.cpp) this function
@@ -20,7 +20,7 @@ def long_corr(longi):
 
     # TODO: Ask Dave what kind of rounding is necessary?
     # calculate the central meridian
-    cen_meridian = 15 * round((longi + 7.5) / 15)  # (to round off)
+    cen_meridian = 15 * round(longi / 15)  # (to round off)
     correction = (cen_meridian - longi) / 15.0
 
     return correction
@@ -35,13 +35,16 @@ def deg2rad(deg):
 #       correct. It is noteworthy to mention that there may be a order of
 #       operations error in the original equation. I had to mess with PEMDAS
 #       to get the original answer.
+#       The hour angle now follows Campbell and Norman (1998) Eq:11.1,
+#       15 * (time - solnoon), so the sun is up at solar noon.  The array
+#       version in solar_geometry.py is checked against this function.
 
 
 def calc_zenith_angle(lati, longi, jday, time):
     """Calculates zenith angle in radians. """
 
     # longitude correction
-    corr = correction_longitude(longi)
+    corr = long_corr(longi)
 
     # for calculations of corrections due to eq of time
     temp = deg2rad(279.575 + (0.9856 * jday))
@@ -77,7 +80,8 @@ def calc_zenith_angle(lati, longi, jday, time):
     declin = asin(0.39785 * sin(temp))
 
     # calculate zenith angle [in radians] (Campbell and Norman 1998, Eq:11.1)
-    rad_conv = deg2rad(15 * time - solnoon)
+    # NOTE: the hour angle is 15 * (time - solnoon), not 15 * time - solnoon
+    rad_conv = deg2rad(15 * (time - solnoon))
 
     z_angle = cos(rad_conv)
     z_angle = z_angle * cos(declin)
@@ -100,7 +104,7 @@ def calc_solar_elevation(z_angle):
 def calc_Qe(Se, jday):
     """Calculate extra-terrestrial radiation (Qe)"""
     Sc = 1370  # Sc = solar constant (W m^-2)
-    Qe = cos((360 * jday) / 365)
+    Qe = cos(deg2rad((360 * jday) / 365))
     Qe = Qe * 0.033
     Qe = 1 + Qe
     Qe = Qe * sin(Se)
@@ -126,26 +130,24 @@ def calc_tau_atm(Qo, Qe):
     return(Qo / Qe)
 
 
-# TODO: Figure out what needs to be returned here
 def calc_fd(tau_atm, Se):
     """Calculate fraction of total above canopy radiation in diffuse form"""
 
-    R = sin(Se)
-    R *= 1.04 * sin(Se)
-    R += sin(Se)
-    R *= 0.847 - 1.61
+    # fraction diffuse under clear skies (Spitters et al. 1986)
+    R = 0.847 - 1.61 * sin(Se) + 1.04 * sin(Se) ** 2
 
     K = (1.47 - R) / 1.66
-    f_d = 0
 
-    if (tau_atm <= 0.22):
-        f_d = 1
-    elif (tau_atm > 0.22 & tau_atm <= 0.35):
-        f_d = 1 - 6.4 * (tau_atm - 0.22) ^ 2
-    elif (tau_atm > 0.35 & tau_atm <= K):
+    if tau_atm <= 0.22:
+        f_d = 1.0
+    elif tau_atm <= 0.35:
+        f_d = 1 - 6.4 * (tau_atm - 0.22) ** 2
+    elif tau_atm <= K:
         f_d = 1.47 - 1.66 * tau_atm
     else:
-        tau_atm = R
+        f_d = R
+
+    return f_d
 
 
 def calc_Qod(fd, Qo):
@@ -0,0 +1,96 @@
+"""
+Created October 18, 2026
+
+Array stage for the above-canopy radiation chain in radiation_module_v_1:
+
+    calc_Qo -> calc_tau_atm -> calc_fd -> calc_Qod/calc_Qob
+            -> calc_Iob/calc_Iod -> calc_QobNIR/calc_QodNIR
+
+partition_radiation runs the whole chain on the Qpar column of the forcing
+file and returns every partitioned flux in one structured array.
+"""
+
+import numpy as np
+
+# fields of the structured array returned by partition_radiation, all W m^-2
+# except for tau_atm and fd which are unitless
+PARTITION_DTYPE = np.dtype([('Qo', 'float64'),
+                            ('tau_atm', 'float64'),
+                            ('fd', 'float64'),
+                            ('Qod', 'float64'),
+                            ('Qob', 'float64'),
+                            ('Iob', 'float64'),
+                            ('Iod', 'float64'),
+                            ('QobNIR', 'float64'),
+                            ('QodNIR', 'float64')])
+
+# factor used to convert PAR to total incoming solar radiation
+con_fac = 2.12766
+# factor to convert units from umol m^-2 s^-1 to W m^-2
+con_units = 0.235
+# fraction of PAR in beam and diffuse form
+fPARbeam = 0.5
+fPARdiff = 0.5
+
+
+def calc_tau_atm(Qo, Qe):
+    """
+    Calculate atmospheric transmissivity.  Rows where the sun is below the
+    horizon (Qe <= 0) get a transmissivity of 0 instead of dividing by Qe.
+    """
+    Qo = np.asarray(Qo, dtype='float64')
+    Qe = np.asarray(Qe, dtype='float64')
+    tau_atm = np.zeros(np.broadcast(Qo, Qe).shape)
+    np.divide(Qo, Qe, out=tau_atm, where=Qe > 0)
+    return tau_atm
+
+
+def calc_fd(tau_atm, Se):
+    """
+    Calculate fraction of total above canopy radiation in diffuse form.
+    Piecewise array version of radiation_module_v_1.calc_fd.
+    """
+    sin_Se = np.sin(Se)
+
+    # fraction diffuse under clear skies (Spitters et al. 1986)
+    R = 0.847 - 1.61 * sin_Se + 1.04 * sin_Se ** 2
+    K = (1.47 - R) / 1.66
+
+    conditions = [tau_atm <= 0.22,
+                  tau_atm <= 0.35,
+                  tau_atm <= K]
+    choices = [1.0,
+               1 - 6.4 * (tau_atm - 0.22) ** 2,
+               1.47 - 1.66 * tau_atm]
+
+    return np.select(conditions, choices, default=R)
+
+
+def partition_radiation(Qpar, Se, Qe):
+    """
+    Partition above-canopy PAR into beam, diffuse and NIR components.
+
+    Args:
+        Qpar: photosynthetically active radiation (umol m^-2 s^-1)
+        Se: solar elevation (radians), see solar_geometry
+        Qe: extra-terrestrial radiation (W m^-2), see solar_geometry
+
+    Returns:
+        Structured array with the fields of PARTITION_DTYPE, one record per
+        row of Qpar.  Night-time rows (Qe <= 0) are treated as fully
+        diffuse.
+    """
+    Qpar = np.asarray(Qpar, dtype='float64')
+    out = np.empty(np.broadcast(Qpar, Se, Qe).shape, dtype=PARTITION_DTYPE)
+
+    out['Qo'] = Qpar * con_fac * con_units
+    out['tau_atm'] = calc_tau_atm(out['Qo'], Qe)
+    out['fd'] = calc_fd(out['tau_atm'], Se)
+    out['Qod'] = out['fd'] * out['Qo']
+    out['Qob'] = out['Qo'] - out['Qod']
+    out['Iob'] = fPARbeam * out['Qob']
+    out['Iod'] = fPARdiff * out['Qod']
+    out['QobNIR'] = out['Qob'] - out['Iob']
+    out['QodNIR'] = out['Qod'] - out['Iod']
+
+    return out
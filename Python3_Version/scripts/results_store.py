@@ -0,0 +1,195 @@
+"""
+Created October 18, 2026
+
+Chunked, compressed columnar store for simulation results.
+
+Half-hourly outputs (ET, NEE, gsv0, psi_soil, Gva, An sun/shade, ...) of
+long or regional runs do not fit in memory and were never written out.
+ResultsStore keeps them in a directory of local files:
+
+    index.json      variables with their dtype and per-row shape, and for
+                    every chunk its first row, number of rows and the
+                    offset and size of its block in every variable file
+    <name>.bin      zlib-compressed blocks of one variable, one per chunk
+
+Appends add chunks of at most chunk_rows rows, so results can be written as
+Pipeline.run_streaming produces them.  Reading a variable decompresses only
+the blocks of that variable that overlap the requested rows.  A per-row
+shape, e.g. (n_cells,), stores many cells side by side.
+"""
+
+import json
+import os
+import zlib
+
+import numpy as np
+
+# bump when the layout of the store changes
+STORE_VERSION = 1
+
+INDEX = 'index.json'
+
+
+class ResultsStore(object):
+    """
+    Append-only store of result variables along a row (time) axis.
+
+    Args:
+        path(string):
+            Directory of the store, created if it does not exist.
+
+        chunk_rows(int):
+            Largest number of rows per compressed block.
+
+        level(int):
+            zlib compression level.
+
+    Attributes:
+        variables(dictionary):
+            Name: (dtype, per-row shape) of every variable.
+
+        chunks(list):
+            Index entry of every chunk, see the module docstring.
+
+    Examples:
+        store = ResultsStore('results/site_1')
+        for out in pipeline.run_streaming(iter_forcing(path)):
+            store.append(out)
+        et = store.read('ET', start=48 * 30, stop=48 * 60)
+    """
+
+    def __init__(self, path, chunk_rows=4096, level=6):
+        self.path = path
+        self.chunk_rows = int(chunk_rows)
+        self.level = level
+        self.variables = {}
+        self.chunks = []
+
+        os.makedirs(path, exist_ok=True)
+        index_path = os.path.join(path, INDEX)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                index = json.load(f)
+            if index.get('version') != STORE_VERSION:
+                raise ValueError("Unsupported results store version: " +
+                                 str(index.get('version')))
+            self.variables = {name: (np.dtype(v['dtype']), tuple(v['shape']))
+                              for name, v in index['variables'].items()}
+            self.chunks = index['chunks']
+
+        # first row of every chunk, for locating the chunks of a window
+        self.__starts = np.array([c['start'] for c in self.chunks],
+                                 dtype='int64')
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def n_rows(self):
+        """Number of rows stored"""
+        if not self.chunks:
+            return 0
+        return self.chunks[-1]['start'] + self.chunks[-1]['rows']
+
+    def __file(self, name):
+        return os.path.join(self.path, name + '.bin')
+
+    def __write_index(self):
+        """Replace the index in one step, so readers never see half of it"""
+        index = {'version': STORE_VERSION,
+                 'variables': {name: {'dtype': dtype.str,
+                                      'shape': list(shape)}
+                               for name, (dtype, shape)
+                               in self.variables.items()},
+                 'chunks': self.chunks}
+        index_path = os.path.join(self.path, INDEX)
+        tmp_path = index_path + ".tmp.{:d}".format(os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+
+    def append(self, data):
+        """
+        Add rows to the end of the store.
+
+        Args:
+            data: structured array (e.g. from Pipeline.run) or dictionary of
+                  name: array with the rows along the first axis.  The
+                  first append defines the variables; later appends must
+                  hold the same ones.
+        """
+        if isinstance(data, np.ndarray) and data.dtype.names:
+            data = {name: data[name] for name in data.dtype.names}
+        data = {name: np.asarray(values) for name, values in data.items()}
+
+        n = len(next(iter(data.values())))
+        if any(len(values) != n for values in data.values()):
+            raise ValueError("All variables must have the same number of "
+                             "rows.")
+
+        if not self.variables:
+            self.variables = {name: (values.dtype, values.shape[1:])
+                              for name, values in data.items()}
+        elif set(data) != set(self.variables):
+            raise ValueError("Variables do not match the store: " +
+                             ", ".join(sorted(set(data) ^
+                                              set(self.variables))))
+
+        files = {name: open(self.__file(name), 'ab')
+                 for name in self.variables}
+        try:
+            for lo in range(0, n, self.chunk_rows):
+                hi = min(lo + self.chunk_rows, n)
+                chunk = {'start': self.n_rows, 'rows': hi - lo, 'blocks': {}}
+                for name, (dtype, shape) in self.variables.items():
+                    values = np.ascontiguousarray(data[name][lo:hi],
+                                                  dtype=dtype)
+                    if values.shape[1:] != shape:
+                        raise ValueError("Shape of " + name + " does not "
+                                         "match the store.")
+                    block = zlib.compress(values.tobytes(), self.level)
+                    f = files[name]
+                    f.seek(0, os.SEEK_END)
+                    chunk['blocks'][name] = [f.tell(), len(block)]
+                    f.write(block)
+                self.chunks.append(chunk)
+        finally:
+            for f in files.values():
+                f.close()
+
+        self.__starts = np.array([c['start'] for c in self.chunks],
+                                 dtype='int64')
+        self.__write_index()
+        return self
+
+    def read(self, name, start=None, stop=None):
+        """
+        Rows start to stop (exclusive) of one variable, decompressing only
+        the blocks that hold them.
+        """
+        dtype, shape = self.variables[name]
+        start, stop, _ = slice(start, stop).indices(self.n_rows)
+        if stop <= start:
+            return np.empty((0,) + shape, dtype=dtype)
+
+        first = np.searchsorted(self.__starts, start, side='right') - 1
+        last = np.searchsorted(self.__starts, stop, side='left')
+
+        out = np.empty((stop - start,) + shape, dtype=dtype)
+        with open(self.__file(name), 'rb') as f:
+            for chunk in self.chunks[first:last]:
+                offset, size = chunk['blocks'][name]
+                f.seek(offset)
+                values = np.frombuffer(zlib.decompress(f.read(size)),
+                                       dtype=dtype)
+                values = values.reshape((chunk['rows'],) + shape)
+
+                lo = max(start, chunk['start'])
+                hi = min(stop, chunk['start'] + chunk['rows'])
+                out[lo - start:hi - start] = values[lo - chunk['start']:
+                                                    hi - chunk['start']]
+        return out
+
+    def read_window(self, names, start=None, stop=None):
+        """Rows start to stop of several variables, as a dictionary"""
+        return {name: self.read(name, start, stop) for name in names}
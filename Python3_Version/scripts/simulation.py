@@ -0,0 +1,402 @@
+"""
+Created October 18, 2026
+
+Half-hourly TREES simulation over a forcing file.
+
+read_forcing reads a tab-delimited forcing file such as
+TREES_INPUT_PARALLEL_TESTING.txt once into one contiguous array per column.
+Pipeline then runs the model over all rows as a sequence of vectorized
+stages:
+
+    solar       solar_table.SolarTable.lookup when a table is given,
+                solar_geometry.solar_geometry otherwise
+    radiation   radiation_partition.partition_radiation
+    gsv0        gsv0.calc_gsv0 with the xylemFactor column as xylem scalar
+    canopy      kernels.canopy_step: aerodynamic conductance, two big leaf
+                canopy radiation, Gc0_k and Farquhar photosynthesis
+    conductance coupled_conductance.solve_coupled
+    fluxes      canopy transpiration and net CO2 exchange
+
+and returns simulated ET and NEE next to the observed columns.  Wind speed
+and vapor pressure deficit are clamped to fixed_params.u_ref_min and
+fixed_params.d_min, since the forcing has calm half-hours and log(D) and
+the aerodynamic conductance need positive values.  The time spent in every
+stage is kept in Pipeline.timings.
+
+About half of the rows are at night.  By default the pipeline finds the
+daylight rows once, those with the sun above the horizon (Qe > 0) and
+measured light (Qpar > 0), runs the radiation, canopy and conductance stages on
+that compacted subset only and scatters the results back, filling night
+rows with defined values (An = -Rd, no sunlit leaves, minimum
+conductance).
+"""
+
+from itertools import islice
+from time import perf_counter
+
+import numpy as np
+
+import constants
+import fixed_params
+from aerodynamic_array import calc_Gva
+from coupled_conductance import solve_coupled
+from gsv0 import calc_gsv0
+from kernels import canopy_step
+from radiation_partition import con_units, partition_radiation
+from solar_geometry import solar_geometry
+from solar_table import SolarTable
+from tau_d_table import get_tau_d_table
+from temperature_response import TemperatureResponse
+
+# columns of the forcing file, in order
+FORCING_COLUMNS = ('jday', 'time', 'u_ref', 't_ref', 'd_ref', 'precip',
+                   'Qpar', 't_canopy', 'd_canopy', 'p_atm', 'CO2_atm', 'Ts0',
+                   'Tsurf', 'Troot', 'Zw', 'xylemFactor', 'NEEobs', 'ET')
+
+# length of a forcing time step (s)
+DT = 1800.0
+
+# stages of Pipeline.run, in order
+STAGES = ('solar', 'radiation', 'gsv0', 'canopy', 'conductance', 'fluxes',
+          'soil')
+
+# fields of the structured array returned by Pipeline.run.  ET is in
+# kg m^-2 s^-1 (mm s^-1), NEE and An in umol m^-2 s^-1 of ground (negative
+# for uptake), conductances in mol m^-2 s^-1 and psi_soil, the root
+# weighted soil water potential, in MPa.  Missing observations and psi_soil
+# without a soil column are NaN.
+SIMULATION_DTYPE = np.dtype([('jday', 'float64'),
+                             ('time', 'float64'),
+                             ('Gsv0', 'float64'),
+                             ('Gva', 'float64'),
+                             ('LAI_sun', 'float64'),
+                             ('LAI_shd', 'float64'),
+                             ('Gc_sun', 'float64'),
+                             ('Gc_shd', 'float64'),
+                             ('An_sun', 'float64'),
+                             ('An_shd', 'float64'),
+                             ('ET', 'float64'),
+                             ('ET_obs', 'float64'),
+                             ('NEE', 'float64'),
+                             ('NEE_obs', 'float64'),
+                             ('psi_soil', 'float64')])
+
+
+def _columns(data, columns):
+    """Split a 2-D table into a dictionary of contiguous float64 columns"""
+    return {name: np.ascontiguousarray(data[:, i], dtype='float64')
+            for i, name in enumerate(columns)}
+
+
+def read_forcing(path, columns=FORCING_COLUMNS):
+    """
+    Read a tab-delimited forcing file with one header line.
+
+    Returns:
+        Dictionary of column name: contiguous float64 array.
+    """
+    return _columns(np.loadtxt(path, skiprows=1, ndmin=2), columns)
+
+
+def iter_forcing(path, chunk_size=4096, columns=FORCING_COLUMNS):
+    """
+    Read a tab-delimited forcing file with one header line in batches.
+
+    Only chunk_size lines are held in memory at a time, so files of any
+    length can be streamed through Pipeline.run_streaming.
+
+    Yields:
+        Dictionaries of column name: contiguous float64 array of at most
+        chunk_size records.
+    """
+    with open(path) as f:
+        next(f)
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                return
+            yield _columns(np.loadtxt(lines, ndmin=2), columns)
+
+
+class Pipeline(object):
+    """
+    Vectorized TREES simulation of whole forcing time series.
+
+    Args:
+        lati, longi(float):
+            Site latitude and longitude (degrees).
+
+        gs_ref(float):
+            Gs_ref (mol m^-2 s^-1), see gs_ref_module.
+
+        ws(float or array):
+            Water stress multiplier of Gs (0-1) for every row, see
+            water_stress_module.  1 means no water stress.
+
+        backend(string):
+            Backend of kernels.canopy_step, None for the default.
+
+        daylight_only(bool):
+            Run the radiation, canopy and photosynthesis stages only for
+            daylight rows, with the sun above the horizon (Qe > 0) and
+            measured light (Qpar > 0).  The other rows get the night-time
+            values: no sunlit leaf area, An = -Rd and the smallest
+            conductance gc_min.  Qpar recorded while the sun is down
+            (night-time sensor offsets, and some evening rows past the
+            computed sunset) is not used.
+
+        soil(SoilColumn):
+            Soil water balance driven by the precip column and the
+            simulated ET, see soil_water_balance.py.  Its water content is
+            the state carried from one run (or chunk) to the next.  None
+            leaves psi_soil NaN.
+
+        root_fraction(array):
+            Fraction of the roots in every soil layer, which splits ET into
+            root uptake and weights psi_soil.  Spread evenly by default.
+
+        solar_table(SolarTable or string):
+            Solar geometry table of the site, or the directory in which to
+            look for/store it (see solar_table.py), so the solar stage is a
+            lookup instead of evaluating solar_geometry for every row.  The
+            forcing times must then fall on the table resolution.  None
+            evaluates solar_geometry.
+
+    Attributes:
+        params(dictionary):
+            Canopy and Farquhar parameters, taken from fixed_params unless
+            passed as keyword arguments.
+
+        timings(dictionary):
+            Seconds spent in every stage of the last run, or of all chunks
+            of the last run_streaming.
+
+        totals(dictionary):
+            Number of 'rows', 'ET' (mm) and 'NEE' (umol m^-2 s^-1 summed
+            over rows) of the last run_streaming so far.
+
+    Examples:
+        forcing = read_forcing('TREES_INPUT_PARALLEL_TESTING.txt')
+        out = Pipeline().run(forcing)
+        out['ET'], out['ET_obs']
+
+        Stream a long file chunk by chunk:
+        for out in Pipeline(soil=column).run_streaming(iter_forcing(path)):
+            ...
+    """
+
+    # parameters that can be passed as keyword arguments, with their
+    # defaults in fixed_params
+    PARAMS = ('LAI_total', 'Pcc', 'omega', 'x_ratio', 'alpha_PAR',
+              'alpha_NIR', 'Kc_25', 'Kc_q10', 'Ko_25', 'Ko_q10', 'Kr_25',
+              'Kr_q10', 'NRf', 'Nl', 'Rd_mult', 'Jvr', 'O2', 'phi_J',
+              'theta_J', 'gc_min', 'h_canopy', 'u_ref_min', 'd_min',
+              'missing')
+
+    def __init__(self,
+                 lati=fixed_params.lati,
+                 longi=fixed_params.longi,
+                 gs_ref=fixed_params.gs_ref,
+                 ws=1.0,
+                 backend=None,
+                 daylight_only=True,
+                 soil=None,
+                 root_fraction=None,
+                 solar_table=None,
+                 **params):
+
+        unknown = set(params) - set(self.PARAMS)
+        if unknown:
+            raise ValueError("Unknown parameters: " +
+                             ", ".join(sorted(unknown)))
+
+        self.lati = lati
+        self.longi = longi
+        self.gs_ref = gs_ref
+        self.ws = ws
+        self.backend = backend
+        self.daylight_only = daylight_only
+        self.soil = soil
+        if soil is not None and root_fraction is None:
+            root_fraction = np.full(soil.n_layers, 1.0 / soil.n_layers)
+        self.root_fraction = root_fraction
+        if solar_table is not None and not isinstance(solar_table,
+                                                      SolarTable):
+            solar_table = SolarTable(solar_table, lati, longi)
+        elif (solar_table is not None and
+              not np.allclose((solar_table.lati, solar_table.longi),
+                              (lati, longi))):
+            raise ValueError("The solar table was built for another site.")
+        self.solar_table = solar_table
+        self.params = {name: params.get(name, getattr(fixed_params, name))
+                       for name in self.PARAMS}
+        self.timings = {}
+        self.totals = {}
+
+        p = self.params
+        # Vcmax25 = 7.16 * Kr_25 * NRf * Nl (Farquhar_module.Vcmax_calc)
+        self.Vcmax25 = 7.16 * p['Kr_25'] * p['NRf'] * p['Nl']
+        self.temperature = TemperatureResponse(
+            p['Kc_25'], p['Kc_q10'], p['Ko_25'], p['Ko_q10'],
+            p['Kr_25'], p['Kr_q10'], p['Jvr'] * self.Vcmax25,
+            R=constants.R)
+        self.tau_d = float(get_tau_d_table()(p['LAI_total'], p['omega'],
+                                             p['x_ratio']))
+
+    def __stage(self, name, start):
+        """Record the time of a stage and return the start of the next"""
+        now = perf_counter()
+        self.timings[name] = self.timings.get(name, 0.0) + now - start
+        return now
+
+    def run(self, forcing):
+        """
+        Simulate every row of the forcing.
+        """
+        self.timings = {}
+        return self.__run(forcing)
+
+    def run_streaming(self, chunks):
+        """
+        Simulate forcing that arrives in consecutive chunks, e.g. from
+        iter_forcing, holding only one chunk in memory.
+
+        The soil water content carries over from one chunk to the next, so
+        the results are those of one run over the whole record.
+
+        Yields:
+            The results of every chunk, see run.
+        """
+        self.timings = {}
+        self.totals = {'rows': 0, 'ET': 0.0, 'NEE': 0.0}
+        for chunk in chunks:
+            out = self.__run(chunk)
+            self.totals['rows'] += out.shape[0]
+            self.totals['ET'] += float(np.sum(out['ET'])) * DT
+            self.totals['NEE'] += float(np.sum(out['NEE']))
+            yield out
+
+    def __run(self, forcing):
+        """
+        Simulate every row of the forcing.
+
+        Args:
+            forcing: dictionary of columns, see read_forcing
+
+        Returns:
+            Structured array with the fields of SIMULATION_DTYPE, one record
+            per row.
+        """
+        p = self.params
+        start = perf_counter()
+
+        n = forcing['jday'].shape[0]
+        out = np.empty(n, dtype=SIMULATION_DTYPE)
+        out['jday'] = forcing['jday']
+        out['time'] = forcing['time']
+
+        u_ref = np.maximum(forcing['u_ref'], p['u_ref_min'])
+        d_ref = np.maximum(forcing['d_ref'], p['d_min'])
+        d_canopy = np.maximum(forcing['d_canopy'], p['d_min'])
+        p_atm = forcing['p_atm']
+        t_leaf = forcing['t_canopy']
+
+        if self.solar_table is not None:
+            z_angle, Se, Qe = self.solar_table.lookup(forcing['jday'],
+                                                      forcing['time'])
+        else:
+            z_angle, Se, Qe = solar_geometry(self.lati, self.longi,
+                                             forcing['jday'], forcing['time'])
+
+        # rows that go through the radiation and photosynthesis stages
+        if self.daylight_only:
+            day = np.flatnonzero((Qe > 0) & (forcing['Qpar'] > 0))
+        else:
+            day = np.arange(n)
+        night = np.setdiff1d(np.arange(n), day, assume_unique=True)
+        start = self.__stage('solar', start)
+
+        rad = partition_radiation(forcing['Qpar'][day], Se[day], Qe[day])
+        start = self.__stage('radiation', start)
+
+        out['Gsv0'] = Gsv0 = np.maximum(
+            calc_gsv0(self.ws, self.gs_ref, d_ref, forcing['xylemFactor']),
+            0.0)
+        start = self.__stage('gsv0', start)
+
+        # Farquhar parameters at leaf temperature; CO2 from ppm to Pa
+        resp = self.temperature(t_leaf)
+        Vcmax = 7.16 * resp['Kr'] * p['NRf'] * p['Nl']
+        Rd = p['Rd_mult'] * Vcmax
+        Ca = forcing['CO2_atm'] * p_atm * 1e-3
+
+        canopy = canopy_step(z_angle[day], rad, u_ref[day],
+                             forcing['t_ref'][day], p_atm[day], Gsv0[day],
+                             Ca[day], Vcmax[day], Rd[day], resp['Kc'][day],
+                             resp['Ko'][day], resp['gammaStar'][day],
+                             resp['Jmax'][day],
+                             z=constants.zr, h=p['h_canopy'],
+                             LAI_total=p['LAI_total'], Pcc=p['Pcc'],
+                             omega=p['omega'], x_ratio=p['x_ratio'],
+                             alpha_PAR=p['alpha_PAR'],
+                             alpha_NIR=p['alpha_NIR'], tau_d=self.tau_d,
+                             O2=p['O2'], phi_J=p['phi_J'],
+                             theta_J=p['theta_J'], backend=self.backend)
+        for name in ('Gva', 'LAI_sun', 'LAI_shd'):
+            out[name][day] = canopy[name]
+        start = self.__stage('canopy', start)
+
+        # conductance in the units of the Farquhar quadratics, as in kernels
+        to_photo = 1e3 / p_atm
+        Gc0 = np.stack([canopy['Gc0_sun'], canopy['Gc0_shd']])
+        Ir = np.stack([canopy['PAR_Ps_sun'],
+                       canopy['PAR_Ps_shd']]) / con_units
+        coupled = solve_coupled(Gc0 * to_photo[day], Ir, Ca[day], Vcmax[day],
+                                Rd[day], resp['Kc'][day], resp['Ko'][day],
+                                p['O2'], resp['gammaStar'][day],
+                                resp['Jmax'][day], p['phi_J'], p['theta_J'],
+                                gc_min=p['gc_min'])
+        out['Gc_sun'][day], out['Gc_shd'][day] = coupled['gc'] / to_photo[day]
+        out['An_sun'][day], out['An_shd'][day] = coupled['An']
+
+        # without light the whole canopy is shaded, only respires and
+        # keeps its smallest conductance
+        out['Gva'][night] = calc_Gva(constants.zr, p['h_canopy'],
+                                     u_ref[night], p_atm[night],
+                                     forcing['t_ref'][night])
+        out['LAI_sun'][night] = 0.0
+        out['LAI_shd'][night] = p['LAI_total']
+        out['Gc_sun'][night] = out['Gc_shd'][night] = (p['gc_min'] /
+                                                       to_photo[night])
+        out['An_sun'][night] = out['An_shd'][night] = -Rd[night]
+        start = self.__stage('conductance', start)
+
+        # canopy transpiration from the conductance to water vapour of both
+        # canopy elements, and net CO2 exchange of the canopy
+        G_canopy = 1.6 * (out['Gc_sun'] * out['LAI_sun'] +
+                          out['Gc_shd'] * out['LAI_shd'])
+        out['ET'] = G_canopy * d_canopy / p_atm * constants.mm_h2o * 1e-3
+        out['NEE'] = -(out['An_sun'] * out['LAI_sun'] +
+                       out['An_shd'] * out['LAI_shd'])
+
+        for name, column in (('ET_obs', 'ET'), ('NEE_obs', 'NEEobs')):
+            obs = forcing[column]
+            out[name] = np.where(obs == p['missing'], np.nan, obs)
+        start = self.__stage('fluxes', start)
+
+        # ET is taken up by the roots in proportion to root_fraction
+        if self.soil is None:
+            out['psi_soil'] = np.nan
+        else:
+            uptake = (out['ET'] * DT)[:, None]
+            theta, _ = self.soil.run(forcing['precip'],
+                                     uptake * self.root_fraction)
+            out['psi_soil'] = self.soil.potential(theta) @ self.root_fraction
+        self.__stage('soil', start)
+
+        return out
+
+
+def run_forcing(path, **kwargs):
+    """Read a forcing file and simulate it; kwargs are passed to Pipeline"""
+    return Pipeline(**kwargs).run(read_forcing(path))
@@ -0,0 +1,226 @@
+"""
+Created October 18, 2026
+
+Soil texture registry.
+
+The pedotransfer regressions for ks, bubbling pressure, pore size index and
+residual water content used to run at import of soil_water_potential.py for
+one hard-coded texture.  They live here as array functions, and
+soil_texture() builds an immutable SoilTexture for a (porosity, %clay,
+%sand) triple the first time it is requested.  Later requests for the same
+texture return the same object, so cells of a regional run that share a
+texture class share their derived parameters.  soil_textures() does the
+same for whole grids of cells, evaluating the regressions once per unique
+texture.
+"""
+
+import numpy as np
+
+# registry of built textures, keyed by (porosity, clay, sand)
+_textures = {}
+
+
+def calc_ks(por, pClay, pSand):
+    """Saturated hydraulic conductivity from porosity, % clay and % sand"""
+    por, pClay, pSand = [np.asarray(a, dtype='float64')
+                         for a in (por, pClay, pSand)]
+
+    # Calculate their squares
+    por2 = por * por
+    pClay2 = pClay * pClay
+    pSand2 = pSand * pSand
+
+    ks = 19.52348 * por
+    ks -= 8.96847 - 0.028212 * pClay
+    ks += 0.00018107 * pSand2
+    ks -= 0.0094125 * pClay2
+    ks -= 8.395215 * por2
+    ks += 0.077718 * pSand * por
+    ks -= 0.00298 * pSand2 * por2
+    ks -= 0.019492 * pClay2 * por2
+    ks += 0.0000173 * pSand2 * pClay
+    ks += 0.02733 * pClay2 * por
+    ks += 0.001434 * pSand2 * por
+    ks -= 0.0000035 * pClay2 * pSand
+
+    return np.exp(ks)
+
+
+def calc_bubbling_pressure(por, pClay, pSand):
+    """Bubbling pressure (cm) from porosity, % clay and % sand"""
+    por, pClay, pSand = [np.asarray(a, dtype='float64')
+                         for a in (por, pClay, pSand)]
+
+    por2 = por * por
+    pClay2 = pClay * pClay
+    pSand2 = pSand * pSand
+
+    bubbling_pressure = 5.33967 + 0.1845 * pClay
+    bubbling_pressure -= 2.483945 * por
+    bubbling_pressure -= 0.00213853 * pClay2
+    bubbling_pressure -= 0.04356 * pSand * por
+    bubbling_pressure -= 0.61745 * pClay * por
+    bubbling_pressure += 0.00143598 * pSand2 * por2
+    bubbling_pressure -= 0.00855375 * pClay2 * por2
+    bubbling_pressure -= 0.00001282 * pSand2 * pClay
+    bubbling_pressure += 0.00895359 * pClay2 * por
+    bubbling_pressure -= 0.00072472 * pSand2 * por
+    bubbling_pressure += 0.0000054 * pClay2 * pSand
+    bubbling_pressure += 0.50028 * por2 * pClay
+
+    return np.exp(bubbling_pressure)
+
+
+def calc_pore_size_index(por, pClay, pSand):
+    """Pore size index from porosity, % clay and % sand"""
+    por, pClay, pSand = [np.asarray(a, dtype='float64')
+                         for a in (por, pClay, pSand)]
+
+    por2 = por * por
+    pClay2 = pClay * pClay
+    pSand2 = pSand * pSand
+
+    pore_size_index = -0.7842831 + 0.0177544 * pSand
+    pore_size_index -= 1.062498 * por
+    pore_size_index -= 0.00005304 * pSand2
+    pore_size_index -= 0.00273493 * pClay2
+    pore_size_index += 1.111349 * por2
+    pore_size_index -= 0.03088295 * pSand * por
+    pore_size_index += 0.00026587 * pSand2 * por2
+    pore_size_index -= 0.00610522 * pClay2 * por2
+    pore_size_index -= 0.00000235 * pSand2 * pClay
+    pore_size_index += 0.00798746 * pClay2 * por
+    pore_size_index -= 0.00674491 * por2 * pClay
+
+    return np.exp(pore_size_index)
+
+
+def calc_residual(por, pClay, pSand):
+    """Residual water content from porosity, % clay and % sand"""
+    por, pClay, pSand = [np.asarray(a, dtype='float64')
+                         for a in (por, pClay, pSand)]
+
+    por2 = por * por
+    pClay2 = pClay * pClay
+
+    residual = -0.0182482 + 0.00087269 * pSand
+    residual += 0.00513488 * pClay
+    residual += 0.02939286 * por
+    residual -= 0.00015395 * pClay2
+    residual -= 0.0010827 * pSand * por
+    residual -= 0.00018233 * pClay2 * por2
+    residual += 0.00030703 * pClay2 * por
+    residual -= 0.0023584 * por2 * pClay
+
+    return residual
+
+
+class SoilTexture(object):
+    """
+    Immutable hydraulic parameters of one soil texture.
+
+    Use soil_texture() or soil_textures() instead of creating these
+    directly, so identical textures share one object.
+
+    Attributes:
+        porosity(float):
+            Porosity (fraction).
+
+        clay, sand(float):
+            Percent clay and sand.
+
+        ks(float):
+            Saturated hydraulic conductivity.
+
+        bubbling_pressure(float):
+            Bubbling pressure (cm).
+
+        pore_size_index(float):
+            Pore size index.
+
+        residual(float):
+            Residual water content.
+    """
+
+    __slots__ = ('porosity', 'clay', 'sand', 'ks', 'bubbling_pressure',
+                 'pore_size_index', 'residual')
+
+    def __init__(self, porosity, clay, sand,
+                 ks, bubbling_pressure, pore_size_index, residual):
+        for name, value in zip(self.__slots__,
+                               (porosity, clay, sand, ks, bubbling_pressure,
+                                pore_size_index, residual)):
+            object.__setattr__(self, name, float(value))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('SoilTexture is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('SoilTexture is immutable')
+
+    def __repr__(self):
+        return ('SoilTexture(porosity=%g, clay=%g, sand=%g)'
+                % (self.porosity, self.clay, self.sand))
+
+    @property
+    def key(self):
+        """(porosity, clay, sand) triple the texture was built from"""
+        return (self.porosity, self.clay, self.sand)
+
+    @property
+    def van_genuchten(self):
+        """
+        Arguments of soil_water_potential after porosity, i.e.
+        (bubbling_pressure, pore_size_index, residual)
+        """
+        return (self.bubbling_pressure, self.pore_size_index, self.residual)
+
+
+def soil_texture(porosity, clay, sand):
+    """
+    SoilTexture for a porosity, % clay and % sand, built on first request
+    and shared afterwards.
+    """
+    key = (float(porosity), float(clay), float(sand))
+    if key not in _textures:
+        _textures[key] = SoilTexture(*(key + (calc_ks(*key),
+                                               calc_bubbling_pressure(*key),
+                                               calc_pore_size_index(*key),
+                                               calc_residual(*key))))
+    return _textures[key]
+
+
+def soil_textures(porosity, clay, sand):
+    """
+    SoilTexture for every cell of a grid.
+
+    The arguments broadcast against each other.  The regressions run once
+    for all textures not built yet, and the resulting objects are shared with
+    soil_texture().
+
+    Returns:
+        Object array of SoilTexture with the broadcast shape of the inputs.
+    """
+    por, pClay, pSand = np.broadcast_arrays(
+        *[np.asarray(a, dtype='float64') for a in (porosity, clay, sand)])
+    shape = por.shape
+
+    keys = np.column_stack((por.ravel(), pClay.ravel(), pSand.ravel()))
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    unique = [tuple(key) for key in unique.tolist()]
+
+    new = np.array([key for key in unique if key not in _textures])
+    if len(new):
+        n_por, n_clay, n_sand = new.T
+        params = np.column_stack(
+            (calc_ks(n_por, n_clay, n_sand),
+             calc_bubbling_pressure(n_por, n_clay, n_sand),
+             calc_pore_size_index(n_por, n_clay, n_sand),
+             calc_residual(n_por, n_clay, n_sand)))
+        for key, p in zip(map(tuple, new.tolist()), params.tolist()):
+            _textures[key] = SoilTexture(*(key + tuple(p)))
+
+    textures = np.empty(len(unique), dtype=object)
+    textures[:] = [_textures[key] for key in unique]
+
+    return textures[inverse.ravel()].reshape(shape)
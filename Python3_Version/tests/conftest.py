@@ -0,0 +1,17 @@
+"""
+Put the scripts directory on the path, since its modules import each other
+by name.
+"""
+
+import os
+import sys
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       os.pardir, 'scripts')
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    os.pardir, 'data')
+FORCING = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       os.pardir, os.pardir,
+                       'TREES_INPUT_PARALLEL_TESTING.txt')
+
+sys.path.insert(0, os.path.abspath(SCRIPTS))
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+
+from batch_runner import SharedForcing, attach, run_batch
+from conftest import FORCING
+from results_store import ResultsStore
+from simulation import Pipeline, read_forcing
+
+# two days of forcing keep the jobs short
+FORCING_COLUMNS = {name: values[:96]
+                   for name, values in read_forcing(FORCING).items()}
+
+
+def total_et(out):
+    return float(np.sum(out['ET']))
+
+
+def test_shared_forcing():
+    shared = SharedForcing(FORCING_COLUMNS)
+    try:
+        columns = attach(shared.descriptor)
+        for name, values in FORCING_COLUMNS.items():
+            np.testing.assert_array_equal(columns[name], values)
+        assert not columns['Qpar'].flags.writeable
+    finally:
+        shared.close()
+
+
+def test_jobs_match_serial_runs():
+    jobs = {'ref': {}, 'sparse': {'LAI_total': 0.5},
+            'bad': {'LAI_total': 'x'}}
+    results = run_batch(jobs, FORCING_COLUMNS, n_workers=2,
+                        summarize=total_et)
+
+    assert set(results.succeeded) == {'ref', 'sparse'}
+    assert set(results.failed) == {'bad'}
+    assert 'Traceback' in results.failed['bad']
+    for job_id in ('ref', 'sparse'):
+        expected = total_et(Pipeline(**jobs[job_id]).run(FORCING_COLUMNS))
+        assert results.succeeded[job_id] == expected
+    assert results.succeeded['sparse'] < results.succeeded['ref']
+
+
+def test_jobs_to_stores(tmp_path):
+    forcing = {'a': FORCING_COLUMNS,
+               'b': {name: values[48:] for name, values
+                     in FORCING_COLUMNS.items()}}
+    jobs = {1: {'forcing': 'a'}, 2: {'forcing': 'b'}}
+    finished = []
+
+    results = run_batch(jobs, forcing, n_workers=2, store_dir=str(tmp_path),
+                        callback=lambda job_id, r: finished.append(job_id))
+
+    assert sorted(finished) == [1, 2]
+    for job_id, n in ((1, 96), (2, 48)):
+        path = results.succeeded[job_id]
+        assert path == os.path.join(str(tmp_path), str(job_id))
+        assert len(ResultsStore(path)) == n
@@ -0,0 +1,77 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import forcing_cache
+from conftest import DATA, FORCING
+from simulation import read_forcing
+
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+    monkeypatch.setenv('TREES_CACHE_DIR', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
+
+
+def test_forcing_round_trip(cache_root):
+    expected = read_forcing(FORCING)
+    first = forcing_cache.load_forcing(FORCING)
+    second = forcing_cache.load_forcing(FORCING)
+
+    for name, values in expected.items():
+        np.testing.assert_array_equal(first[name], values)
+        np.testing.assert_array_equal(second[name], values)
+    assert isinstance(second['Qpar'], np.memmap)
+
+    # nothing is written next to the source
+    assert len(os.listdir(str(cache_root))) == 1
+    assert not any(n.endswith('_columns')
+                   for n in os.listdir(os.path.dirname(FORCING)))
+
+
+def test_quoted_csv():
+    path = os.path.join(DATA, 'PICO_atm_demand_data.csv')
+    data = forcing_cache.load_csv(path, ('row', 'D', 'Gs'))
+
+    assert data['row'][:3].tolist() == [1, 2, 3]
+    assert data['D'][0] == pytest.approx(0.4)
+    assert data['Gs'][0] == pytest.approx(0.133528626)
+
+
+def test_keyed_on_options():
+    path = os.path.join(DATA, 'PICO_atm_demand_data.csv')
+    full = forcing_cache.load_csv(path, ('row', 'D', 'Gs'))
+    part = forcing_cache.load_csv(path, ('D', 'Gs'), usecols=(1, 2),
+                                  dtype='float32')
+
+    assert part['D'].dtype == np.float32
+    np.testing.assert_allclose(part['Gs'], full['Gs'], rtol=1e-6)
+    # the first cache is still valid and untouched
+    assert forcing_cache.load_csv(path, ('row', 'D', 'Gs'))['D'].dtype == \
+        np.float64
+
+
+def test_stale_cache(tmp_path):
+    path = str(tmp_path / 'obs.csv')
+    shutil.copy(os.path.join(DATA, 'PICO_ws_obs_data.csv'), path)
+    first = forcing_cache.load_csv(path, ('Mpa', 'PLC'))
+
+    with open(path, 'a') as f:
+        f.write("-9.0,99.0\n")
+    os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+
+    second = forcing_cache.load_csv(path, ('Mpa', 'PLC'))
+    assert len(second['Mpa']) == len(first['Mpa']) + 1
+    assert second['PLC'][-1] == 99.0
+
+
+def test_rejects_text(tmp_path):
+    path = str(tmp_path / 'dates.csv')
+    with open(path, 'w') as f:
+        f.write('"date","x"\n"6/28/2009",1.0\n')
+
+    with pytest.raises(ValueError):
+        forcing_cache.load_csv(path, ('date', 'x'))
+    assert forcing_cache.load_csv(path, ('x',), usecols=1)['x'][0] == 1.0
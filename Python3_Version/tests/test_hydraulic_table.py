@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from hydraulic_table import get_hydraulic_table
+from soil_texture import soil_texture
+from soil_water_potential import (soil_water_potential_array,
+                                  unsaturated_conductivity_array)
+
+
+@pytest.mark.parametrize('key', [(0.4, 5, 90), (0.5, 25, 25),
+                                 (0.45, 50, 20)])
+def test_table_matches_closed_form(key):
+    texture = soil_texture(*key)
+    table = get_hydraulic_table(texture)
+
+    # dense enough to land between the grid points, plus both ends
+    theta = np.linspace(texture.residual, texture.porosity, 100003)
+    psi = soil_water_potential_array(theta, texture.porosity,
+                                     *texture.van_genuchten)
+    ku = unsaturated_conductivity_array(theta, texture.ks, texture.porosity,
+                                        texture.pore_size_index,
+                                        texture.residual)
+
+    np.testing.assert_allclose(table.psi_soil(theta), psi, atol=1e-4)
+    np.testing.assert_allclose(table.ku(theta), ku, atol=1e-4 * texture.ks)
+    assert table.max_error['psi'] <= 1e-4
+    assert table.max_error['ku'] <= 1e-4
+    assert np.all(np.diff(table.psi_soil(theta)) >= 0)
+
+
+def test_table_shape_and_cache():
+    texture = soil_texture(0.5, 25, 25)
+    table = get_hydraulic_table(texture)
+    theta = np.full((3, 4), 0.3)
+
+    assert table.psi_soil(theta).shape == (3, 4)
+    assert get_hydraulic_table(texture) is table
+    assert get_hydraulic_table(texture, n_points=1025) is not table
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+import fixed_params
+import kernels
+from aerodynamic_conductance_module_v_1 import calc_Gva
+import canopy_conductance as cc
+import Farquhar_module_v_0_5_1 as fm
+from Gc0_k_module import calc_Gc0_k
+from radiation_partition import partition_radiation
+from solar_geometry import solar_geometry
+
+TAU_D = 0.8
+
+BACKENDS = [pytest.param('numba', marks=pytest.mark.skipif(
+                kernels.numba is None, reason="numba is not installed")),
+            'numpy']
+
+
+@pytest.fixture(scope='module')
+def forcing():
+    """Random forcing and Farquhar parameters at leaf temperature"""
+    n = 500
+    rng = np.random.default_rng(0)
+    jday = rng.integers(1, 366, n)
+    time = rng.integers(0, 48, n) * 0.5
+    z_angle, Se, Qe = solar_geometry(fixed_params.lati, fixed_params.longi,
+                                     jday, time)
+    rad = partition_radiation(rng.uniform(0, 2000, n) * (Qe > 0), Se, Qe)
+
+    t_leaf = rng.uniform(-5, 35, n)
+    Vcmax = rng.uniform(20, 80, n)
+    return dict(z_angle=z_angle, rad=rad,
+                u_ref=rng.uniform(0.5, 8, n),
+                t_ref=t_leaf,
+                p_atm=rng.uniform(70, 80, n),
+                Gsv0=rng.uniform(0.01, 0.3, n),
+                Ca=rng.uniform(25, 30, n),
+                Vcmax=Vcmax,
+                Rd=0.015 * Vcmax,
+                Kc=fm.Kc_calc(t_leaf, 30.0, 2.1),
+                Ko=fm.Ko_calc(t_leaf, 30000.0, 1.2),
+                gammaStar=fm.gammaStar_calc(t_leaf),
+                Jmax=2.1 * Vcmax)
+
+
+def reference(f, z=30.0, h=15.0, O2=21000.0, phi_J=0.3, theta_J=0.7):
+    """canopy_step one time step at a time with the original modules"""
+    LAI_total = fixed_params.LAI_total
+    alpha_PAR = fixed_params.alpha_PAR
+    alpha_NIR = fixed_params.alpha_NIR
+    Kd = cc.Kd_calc(TAU_D, LAI_total)
+
+    out = np.empty(len(f['z_angle']), dtype=kernels.KERNEL_DTYPE)
+    for i, r in enumerate(out):
+        rad = f['rad'][i]
+        Gva = calc_Gva(z, h, f['u_ref'][i], f['p_atm'][i], f['t_ref'][i])
+
+        z_angle = min(f['z_angle'][i], kernels.max_z_angle)
+        Kbe = cc.Kbe_calc(fixed_params.omega, fixed_params.x_ratio, z_angle)
+        LAI_sun = cc.LAI_sun_calc(LAI_total, fixed_params.Pcc, Kbe)
+        LAI_shd = cc.LAI_shade_calc(LAI_total, LAI_sun)
+        Id = cc.Qd_PAR_calc(rad['Iod'], alpha_PAR, Kd, LAI_total)
+        Isc = cc.Qsc_PAR_calc(rad['Iob'], alpha_PAR, Kbe, LAI_total)
+        Qd_NIR = cc.Qd_NIR_calc(rad['QodNIR'], alpha_NIR, Kd, LAI_total)
+        Qsc_NIR = cc.Qsc_NIR_calc(rad['QobNIR'], alpha_NIR, Kbe, LAI_total)
+
+        r['Gva'] = Gva
+        r['LAI_sun'] = LAI_sun
+        r['LAI_shd'] = LAI_shd
+        r['Q_sun'] = cc.Q_sun_calc(alpha_PAR, Kbe, rad['Iob'], Id, Isc,
+                                   alpha_NIR, rad['QobNIR'], Qd_NIR, Qsc_NIR)
+        r['Q_shd'] = cc.Q_shd_calc(alpha_PAR, Id, Isc, alpha_NIR, Qd_NIR,
+                                   Qsc_NIR)
+        r['PAR_Ps_sun'] = cc.PAR_Ps_sun_calc(alpha_PAR, Kbe, rad['Iob'], Id,
+                                             Isc)
+        r['PAR_Ps_shd'] = cc.PAR_Ps_shd_calc(alpha_PAR, Kbe, rad['Iob'], Id,
+                                             Isc)
+
+        for k, L in (('sun', LAI_sun), ('shd', LAI_shd)):
+            gc0 = r['Gc0_' + k] = calc_Gc0_k(f['Gsv0'][i], Gva, L)
+            gc0 *= 1e3 / f['p_atm'][i]
+            J = fm.J_calc(r['PAR_Ps_' + k] / kernels.con_units,
+                          f['Jmax'][i], phi_J, theta_J)
+            Av = fm.quad_Av_calc(gc0, f['Ca'][i], f['Vcmax'][i], f['Rd'][i],
+                                 f['Kc'][i], f['Ko'][i], O2,
+                                 f['gammaStar'][i])
+            Aj = fm.quad_Aj_calc(gc0, f['Ca'][i], f['gammaStar'][i], J,
+                                 f['Rd'][i])
+            r['An_' + k] = fm.An_k_calc(Av, Aj, f['Rd'][i])
+    return out
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_canopy_step_matches_reference(forcing, backend):
+    expected = reference(forcing)
+    out = kernels.canopy_step(tau_d=TAU_D, backend=backend, **forcing)
+
+    for name in kernels.KERNEL_DTYPE.names:
+        assert np.all(np.isfinite(out[name])), name
+        np.testing.assert_allclose(out[name], expected[name],
+                                   rtol=1e-9, atol=1e-12, err_msg=name)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_canopy_step_broadcasts_scalars(forcing, backend):
+    f = dict(forcing, p_atm=75.0, Ca=27.0)
+    expected = kernels.canopy_step(
+        tau_d=TAU_D, backend=backend,
+        **dict(f, p_atm=np.full(len(f['t_ref']), 75.0),
+               Ca=np.full(len(f['t_ref']), 27.0)))
+    out = kernels.canopy_step(tau_d=TAU_D, backend=backend, **f)
+
+    for name in kernels.KERNEL_DTYPE.names:
+        np.testing.assert_allclose(out[name], expected[name], rtol=1e-12,
+                                   err_msg=name)
+
+
+def test_unknown_backend(forcing):
+    with pytest.raises(ValueError):
+        kernels.canopy_step(tau_d=TAU_D, backend='fortran', **forcing)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from results_store import ResultsStore
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'store')
+    rng = np.random.default_rng(0)
+    et = rng.random(1000)
+    psi = rng.random((1000, 3)).astype('float32')
+    flag = rng.random(1000) > 0.5
+
+    store = ResultsStore(path, chunk_rows=128)
+    store.append({'ET': et[:300], 'psi': psi[:300], 'flag': flag[:300]})
+    store.append({'ET': et[300:], 'psi': psi[300:], 'flag': flag[300:]})
+
+    # reopen from disk
+    store = ResultsStore(path)
+    assert len(store) == 1000
+    assert store.variables['psi'] == (np.dtype('float32'), (3,))
+    np.testing.assert_array_equal(store.read('ET'), et)
+    np.testing.assert_array_equal(store.read('flag'), flag)
+
+    # windows across chunk and append boundaries
+    window = store.read_window(['ET', 'psi'], 250, 530)
+    np.testing.assert_array_equal(window['ET'], et[250:530])
+    np.testing.assert_array_equal(window['psi'], psi[250:530])
+    assert store.read('ET', 900, 900).shape == (0,)
+    np.testing.assert_array_equal(store.read('ET', -10), et[-10:])
+
+
+def test_structured_rows(tmp_path):
+    out = np.zeros(10, dtype=[('ET', 'float64'), ('NEE', 'float64')])
+    out['ET'] = np.arange(10)
+    store = ResultsStore(str(tmp_path)).append(out)
+    np.testing.assert_array_equal(store.read('ET'), out['ET'])
+
+
+def test_rejects_other_variables(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append({'ET': np.zeros(5)})
+    with pytest.raises(ValueError):
+        store.append({'NEE': np.zeros(5)})
+    with pytest.raises(ValueError):
+        store.append({'ET': np.zeros((5, 2))})
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+import fixed_params
+from conftest import FORCING
+from results_store import ResultsStore
+from simulation import Pipeline, iter_forcing, read_forcing
+from soil_texture import soil_texture
+from soil_water_balance import SoilColumn
+from solar_geometry import solar_geometry
+from solar_table import SolarTable
+
+
+@pytest.fixture(scope='module')
+def forcing():
+    return read_forcing(FORCING)
+
+
+def test_solar_table_matches_solar_geometry(tmp_path, forcing):
+    table = SolarTable(str(tmp_path))
+    expected = solar_geometry(fixed_params.lati, fixed_params.longi,
+                              forcing['jday'], forcing['time'])
+    for value, ref in zip(table.lookup(forcing['jday'], forcing['time']),
+                          expected):
+        np.testing.assert_allclose(value, ref, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize('as_dir', [True, False])
+def test_pipeline_with_solar_table(tmp_path, forcing, as_dir):
+    solar = str(tmp_path) if as_dir else SolarTable(str(tmp_path))
+    expected = Pipeline().run(forcing)
+    out = Pipeline(solar_table=solar).run(forcing)
+
+    for name in out.dtype.names:
+        np.testing.assert_allclose(out[name], expected[name], rtol=1e-9,
+                                   atol=1e-15, err_msg=name)
+
+
+def test_solar_table_of_another_site(tmp_path):
+    table = SolarTable(str(tmp_path), lati=40.0, longi=-105.0)
+    with pytest.raises(ValueError):
+        Pipeline(solar_table=table)
+
+
+def test_daylight_only(forcing):
+    out = Pipeline().run(forcing)
+    full = Pipeline(daylight_only=False).run(forcing)
+
+    z_angle, Se, Qe = solar_geometry(fixed_params.lati, fixed_params.longi,
+                                     forcing['jday'], forcing['time'])
+    day = (Qe > 0) & (forcing['Qpar'] > 0)
+    assert 0 < day.sum() < len(day)
+
+    # daylight rows are the same as when every row runs through the stages
+    for name in out.dtype.names:
+        np.testing.assert_allclose(out[name][day], full[name][day],
+                                   rtol=1e-12, err_msg=name)
+
+    # the other rows, including light recorded with the sun down, are night
+    night = ~day
+    assert np.any(night & (forcing['Qpar'] > 0))
+    assert np.all(out['LAI_sun'][night] == 0)
+    assert np.all(out['An_sun'][night] == out['An_shd'][night])
+    assert np.all(out['An_shd'][night] < 0)
+
+
+def test_streaming_matches_run(tmp_path):
+    # the first 30 days, streamed in chunks that split days
+    path = str(tmp_path / 'forcing.txt')
+    with open(FORCING) as f, open(path, 'w') as out:
+        out.writelines(line for _, line in zip(range(48 * 30 + 1), f))
+
+    def pipeline():
+        column = SoilColumn([soil_texture(0.45, 20, 40)] * 5, 10.0, 0.25)
+        return Pipeline(soil=column)
+
+    expected = pipeline().run(read_forcing(path))
+
+    store = ResultsStore(str(tmp_path / 'store'), chunk_rows=200)
+    streaming = pipeline()
+    for out in streaming.run_streaming(iter_forcing(path, chunk_size=500)):
+        store.append(out)
+
+    assert len(store) == len(expected) == 48 * 30
+    assert streaming.totals['rows'] == len(expected)
+    for name in ('ET', 'NEE', 'psi_soil', 'Gc_sun'):
+        np.testing.assert_allclose(store.read(name), expected[name],
+                                   rtol=1e-9, atol=1e-12, err_msg=name)
+    assert np.all(np.isfinite(store.read('psi_soil')))
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from soil_texture import (calc_bubbling_pressure, calc_ks,
+                          calc_pore_size_index, calc_residual, soil_texture,
+                          soil_textures)
+
+# (porosity, % clay, % sand): (ks, bubbling_pressure, pore_size_index,
+# residual) from the regressions that ran at import of the original
+# soil_water_potential.py
+REFERENCE = {
+    (0.5, 0.25, 0.25): (0.2756026846582057, 59.88798573508006,
+                        0.354320257654403, -0.002335491093750002),
+    (0.45, 20.0, 40.0): (1.6653727337621753, 26.57307061268223,
+                         0.32140053759939163, 0.082460337),
+    (0.4, 10.0, 80.0): (19.3836436572357, 7.193162485337812,
+                        0.41501361336512377, 0.07022202399999998),
+}
+
+
+@pytest.mark.parametrize('key', sorted(REFERENCE))
+def test_parameters(key):
+    texture = soil_texture(*key)
+    np.testing.assert_allclose(
+        (texture.ks, texture.bubbling_pressure, texture.pore_size_index,
+         texture.residual), REFERENCE[key], rtol=1e-12)
+    assert texture.key == key
+    assert texture.van_genuchten == (texture.bubbling_pressure,
+                                     texture.pore_size_index,
+                                     texture.residual)
+
+
+def test_sand_drains_faster_than_clay():
+    sand = soil_texture(0.4, 5, 90)
+    clay = soil_texture(0.45, 50, 20)
+    assert sand.ks > 10 * clay.ks
+    assert sand.bubbling_pressure < clay.bubbling_pressure
+
+
+def test_memoized_and_immutable():
+    texture = soil_texture(0.45, 20, 40)
+    assert soil_texture(0.45, 20.0, 40.0) is texture
+    with pytest.raises(AttributeError):
+        texture.ks = 1.0
+    assert not hasattr(texture, '__dict__')
+
+
+def test_grid():
+    porosity = np.array([[0.43, 0.42], [0.43, 0.41]])
+    textures = soil_textures(porosity, [30.0, 15.0], 35.0)
+
+    assert textures.shape == (2, 2)
+    assert textures[0, 0] is textures[1, 0] is soil_texture(0.43, 30, 35)
+    for t in textures.ravel():
+        por, clay, sand = t.key
+        np.testing.assert_allclose(
+            (t.ks, t.bubbling_pressure, t.pore_size_index, t.residual),
+            (calc_ks(por, clay, sand),
+             calc_bubbling_pressure(por, clay, sand),
+             calc_pore_size_index(por, clay, sand),
+             calc_residual(por, clay, sand)), rtol=1e-12)
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from soil_texture import soil_texture
+from soil_water_balance import SoilColumn
+from soil_water_potential import (soil_water_potential_array,
+                                  unsaturated_conductivity_array)
+
+SAND = soil_texture(0.4, 10, 80)
+LOAM = soil_texture(0.4, 40, 40)
+
+
+def run(texture, theta, precip, uptake=0.0, n_layers=10, dz=5.0):
+    column = SoilColumn([texture] * n_layers, dz, theta)
+    storage = column.storage
+    theta, fluxes = column.run(precip, uptake)
+    balance = (column.storage - storage -
+               np.sum(fluxes['infiltration'] - fluxes['drainage'] -
+                      fluxes['uptake']))
+    return column, fluxes, balance
+
+
+def check(fluxes, balance, precip):
+    assert np.all(fluxes['converged'])
+    assert abs(balance) < 1e-3 * len(fluxes)
+    assert np.all(fluxes['infiltration'] >= 0)
+    assert np.all(fluxes['infiltration'] <= precip + 1e-12)
+    np.testing.assert_allclose(fluxes['infiltration'] + fluxes['runoff'],
+                               precip)
+
+
+@pytest.mark.parametrize('theta', [0.08, 0.05])
+@pytest.mark.parametrize('rain', [5.0, 20.0, 50.0])
+def test_dry_sand(theta, rain):
+    precip = np.full(4, rain)
+    column, fluxes, balance = run(SAND, theta, precip)
+    check(fluxes, balance, precip)
+
+    # rain well below ks soaks into sand
+    assert np.sum(fluxes['runoff']) < 0.1 * np.sum(precip)
+
+
+@pytest.mark.parametrize('rain', [5.0, 20.0, 50.0])
+def test_loam(rain):
+    precip = np.full(4, rain)
+    column, fluxes, balance = run(LOAM, 0.2, precip)
+    check(fluxes, balance, precip)
+
+
+def test_ponding():
+    # rain far above ks of the loam ponds and runs off once the top layer
+    # fills up
+    precip = np.full(6, 50.0)
+    column, fluxes, balance = run(LOAM, 0.2, precip)
+    check(fluxes, balance, precip)
+
+    assert 10 * LOAM.ks * 0.5 < precip[0]
+    assert np.all(fluxes['runoff'][1:] > 0.5 * precip[1:])
+    assert column.theta[0] > 0.99 * LOAM.porosity
+
+
+def test_storms_with_uptake():
+    rng = np.random.default_rng(1)
+    precip = np.where(rng.random(300) < 0.1, rng.exponential(8, 300), 0.0)
+    for texture in (SAND, LOAM, soil_texture(0.45, 60, 10)):
+        column, fluxes, balance = run(texture, 0.15, precip, 0.05)
+        check(fluxes, balance, precip)
+        assert np.all(column.theta >= column.theta_min - 1e-12)
+
+
+def test_layers_use_their_table():
+    column = SoilColumn([SAND, LOAM, SAND, LOAM], 5.0, 0.3)
+    theta = np.linspace(0.06, 0.4, 50)[:, None] * np.ones(4)
+    porosity, _, pore_size_index, residual = column.params
+
+    np.testing.assert_allclose(
+        column.potential(theta),
+        soil_water_potential_array(theta, *column.params), atol=1e-4)
+    np.testing.assert_allclose(
+        column.conductivity(theta),
+        unsaturated_conductivity_array(theta, column.ks, porosity,
+                                       pore_size_index, residual),
+        atol=1e-4 * column.ks.max())
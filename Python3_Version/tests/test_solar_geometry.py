@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import radiation_module_v_1 as rm
+from solar_geometry import (calc_zenith_angle, equation_of_time,
+                            long_corr_array, solar_geometry)
+
+# site of fixed_params and the forcing file, on Mountain Standard Time
+# (105 W)
+LATI = 41.08
+LONGI = -106.318
+
+
+@pytest.mark.parametrize('longi, corr', [(-106.318, -1.318 / 15),
+                                         (-105.0, 0.0),
+                                         (-101.0, 4.0 / 15),
+                                         (-112.0, -7.0 / 15),
+                                         (-118.0, 2.0 / 15),
+                                         (-0.5, -0.5 / 15)])
+def test_long_corr(longi, corr):
+    assert long_corr_array(longi) == pytest.approx(corr)
+    assert rm.long_corr(longi) == pytest.approx(corr)
+
+
+@pytest.mark.parametrize('doy, noon', [(172, 12 + 7.0 / 60),
+                                       (307, 11 + 49.0 / 60),
+                                       (42, 12 + 19.5 / 60)])
+def test_solar_noon(doy, noon):
+    """Local standard time of the smallest zenith angle"""
+    time = np.arange(10.0, 14.0, 1 / 3600.0)
+    z_angle = calc_zenith_angle(LATI, LONGI, np.full(time.shape, doy), time)
+    t_min = time[np.argmin(z_angle)]
+
+    # Campbell and Norman (1998) Eq:11.3
+    assert t_min == pytest.approx(12 - (-1.318 / 15 + equation_of_time(doy)),
+                                  abs=2 / 3600.0)
+    # almanac solar noon, to the minute
+    assert t_min == pytest.approx(noon, abs=1.5 / 60)
+
+
+def test_scalar_version_matches():
+    jday = np.repeat(np.arange(1, 366, 7), 48)
+    time = np.tile(np.arange(48) * 0.5, len(jday) // 48)
+    z_angle, Se, Qe = solar_geometry(LATI, LONGI, jday, time)
+    expected = [rm.calc_zenith_angle(LATI, LONGI, d, t)
+                for d, t in zip(jday, time)]
+    np.testing.assert_allclose(z_angle, expected, rtol=1e-10, atol=1e-10)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import fixed_params as fp
+import Farquhar_module_v_0_5_1 as fm
+from constants import R
+from temperature_response import TemperatureResponse
+
+JMAX25 = fp.Jvr * 50.0
+
+# stated bounds of the default 0.01 C grid, see TemperatureResponse
+BOUNDS = {'Kc': 1e-7, 'Ko': 1e-7, 'Kr': 1e-7, 'gammaStar': 1e-7,
+          'Jmax': 1e-6}
+
+CLOSED_FORM = {'Kc': lambda t: fm.Kc_calc(t, fp.Kc_25, fp.Kc_q10),
+               'Ko': lambda t: fm.Ko_calc(t, fp.Ko_25, fp.Ko_q10),
+               'Kr': lambda t: fm.Kr_calc(t, fp.Kr_25, fp.Kr_q10),
+               'gammaStar': fm.gammaStar_calc,
+               'Jmax': lambda t: fm.Jmax_calc(JMAX25, t, R)}
+
+
+def make(**kwargs):
+    return TemperatureResponse(fp.Kc_25, fp.Kc_q10, fp.Ko_25, fp.Ko_q10,
+                               fp.Kr_25, fp.Kr_q10, JMAX25, **kwargs)
+
+
+@pytest.mark.parametrize('name', TemperatureResponse.FIELDS)
+def test_error_bound(name):
+    tr = make()
+    assert tr.max_rel_error[name] < BOUNDS[name]
+
+    # midpoints of every grid cell plus random temperatures in the grid
+    t = np.concatenate([tr.t_min + tr.step * (np.arange(tr.n - 1) + 0.5),
+                        np.random.default_rng(0).uniform(tr.t_min, tr.t_max,
+                                                         2000)])
+    expected = np.array([CLOSED_FORM[name](ti) for ti in t])
+    rel_error = np.abs(getattr(tr, name)(t) - expected) / np.abs(expected)
+
+    assert np.max(rel_error) < BOUNDS[name]
+    # the reported error is the largest one, up to rounding
+    assert np.max(rel_error) <= tr.max_rel_error[name] * (1 + 1e-3) + 1e-15
+
+
+@pytest.mark.parametrize('name', TemperatureResponse.FIELDS)
+def test_outside_grid_is_exact(name):
+    tr = make()
+    t = np.array([-60.0, tr.t_min - 0.5, tr.t_max + 0.5, 80.0])
+    expected = np.array([CLOSED_FORM[name](ti) for ti in t])
+    np.testing.assert_allclose(getattr(tr, name)(t), expected, rtol=1e-12)
+
+
+def test_exact_matches_closed_form():
+    t = np.linspace(-30.0, 45.0, 301)
+    values = make(exact=True)(t)
+    for name, f in CLOSED_FORM.items():
+        np.testing.assert_allclose(values[name], [f(ti) for ti in t],
+                                   rtol=1e-12, err_msg=name)
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from gsv0 import Gsv_0, calc_gsv0
+from time_alignment import (hold, repeat_to, timestamps_from_dates,
+                            timestamps_from_jday)
+
+
+def test_timestamps():
+    times = timestamps_from_jday([2009179, 2009179, 2009180], [0.0, 13.5, 0.5])
+    days = timestamps_from_dates(['6/28/2009', '6/28/2009', '6/29/2009'])
+    np.testing.assert_array_equal(
+        times, days + np.array([0, 810, 30], dtype='timedelta64[m]'))
+
+
+def test_repeat_to():
+    values = np.arange(3.0)
+    assert repeat_to(values, 3) is values
+    assert repeat_to(values, 7).tolist() == [0, 0, 1, 1, 2, 2, 2]
+
+    ensemble = np.stack((values, 10 * values))
+    np.testing.assert_array_equal(repeat_to(ensemble, 6)[1],
+                                  [0, 0, 10, 10, 20, 20])
+
+
+def test_d_obs_by_timestamp():
+    # two days of half-hours, VPD recorded at irregular times
+    jday = np.repeat([2009179, 2009180], 48)
+    hours = np.tile(np.arange(48) / 2.0, 2)
+    times = timestamps_from_jday(jday, hours)
+    d_times = timestamps_from_jday([2009179, 2009179, 2009180],
+                                   [0.0, 9.25, 15.0])
+    d_obs = np.array([0.5, 2.0, 1.0])
+
+    ws = SimpleNamespace(obs=None, sim=np.full(96, 0.8), r_sqr=None)
+    gs = SimpleNamespace(gs_obs=None, gs_sim=None, gs_ref=0.119, d_obs=d_obs,
+                         d_times=d_times, r_sqr=None)
+    xs = SimpleNamespace(obs=None, sim=np.array([1.0, 0.5]),
+                         dates=np.array(['6/28/2009', '6/29/2009']))
+
+    model = Gsv_0(xs, ws, gs)
+    model.calculate(times)
+
+    d = np.select([times < d_times[1], times < d_times[2]], d_obs[:2],
+                  d_obs[2])
+    expected = calc_gsv0(ws.sim, 0.119, d, np.repeat(xs.sim, 48))
+    np.testing.assert_allclose(model.gsv_0, expected)
+    assert np.array_equal(hold(d_times, d_obs, times), d)
@@ -0,0 +1,88 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from blue_stain_xylem_scaling_module import XylemScalar
+from conftest import DATA
+from gsv0 import Gsv_0
+from uncertainty import XS_PARAMS, gsv0_member, gsv0_uncertainty
+from water_stress_module import water_stress_module
+
+
+@pytest.fixture
+def xs(monkeypatch):
+    # XylemScalar changes the working directory
+    monkeypatch.chdir(os.getcwd())
+    return XylemScalar(DATA, 'blue_stain_temp_and_growth_rate.csv',
+                       'CP_daily_at_and_perc_sap_flux_decline.csv')
+
+
+def test_return_covar(monkeypatch):
+    # water_stress_module changes the working directory
+    monkeypatch.chdir(os.getcwd())
+
+    a, b = water_stress_module(DATA, 'PICO_ws_obs_data.csv')
+    (a_c, b_c), covar = water_stress_module(DATA, 'PICO_ws_obs_data.csv',
+                                            return_covar=True)
+
+    assert (a_c, b_c) == (a, b)
+    assert covar.shape == (2, 2)
+    assert np.all(np.isfinite(covar))
+    assert np.all(np.diag(covar) > 0)
+
+
+def test_covar_feeds_uncertainty(monkeypatch, xs):
+    monkeypatch.chdir(os.getcwd())
+
+    ws_params, ws_covar = water_stress_module(DATA, 'PICO_ws_obs_data.csv',
+                                              return_covar=True)
+    n = 4 * len(xs.sim)
+    psi = np.linspace(-3.0, -0.5, n)
+    d_obs = np.full(n, 1.5)
+
+    bands = gsv0_uncertainty(ws_params, ws_covar, 0.119, 1e-4, xs, psi,
+                             d_obs, n_samples=200, n_workers=1, seed=0)
+
+    assert bands[50].shape == (n,)
+    assert np.all(bands[min(bands)] <= bands[max(bands)])
+
+
+def test_member_matches_model(xs):
+    ws_params = np.array([2.0, 1.5])
+    n = 4 * len(xs.sim)
+    psi = np.linspace(-3.0, -0.5, n)
+    d_obs = np.linspace(0.5, 2.5, n // 2)
+
+    ws = SimpleNamespace(obs=None, sim=1 - 1 / (1 + 2.0 * np.exp(1.5 * psi)),
+                         r_sqr=None)
+    gs = SimpleNamespace(gs_obs=None, gs_sim=None, gs_ref=0.119, d_obs=d_obs,
+                         r_sqr=None)
+    model = Gsv_0(xs, ws, gs)
+    model.calculate()
+
+    member = gsv0_member(ws_params[None], np.array([0.119]),
+                         np.array([[xs.coeff[k] for k in XS_PARAMS]]),
+                         psi, d_obs, xs.temp)
+
+    np.testing.assert_allclose(member[0], model.gsv_0, rtol=1e-9)
+
+
+def test_xs_covar_widens_bands(xs):
+    n = 4 * len(xs.sim)
+    psi = np.full(n, -1.0)
+    d_obs = np.full(n, 1.5)
+    args = ((2.0, 1.5), np.zeros((2, 2)), 0.119, 0.0)
+
+    with_xs = gsv0_uncertainty(*args, xs, psi, d_obs, n_samples=200,
+                               n_workers=1, seed=0)
+    xs.covar = {'gauss': np.zeros((3, 3)), 'xs': np.zeros((2, 2))}
+    without = gsv0_uncertainty(*args, xs, psi, d_obs, n_samples=200,
+                               n_workers=1, seed=0)
+
+    assert np.allclose(without[2.5], without[97.5])
+    # the scalar spreads as the simulated biomass accumulates
+    width = (with_xs[97.5] - with_xs[2.5]) / np.abs(with_xs[50])
+    assert np.all(width >= 0)
+    assert width[-1] > 0.1